@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""Benchmark idea_manager operations against synthetic ideas folders.
+
+Usage:  python boomerang_bench.py run [--sizes 1000,10000] [--output bench.json] ...
+        python boomerang_bench.py compare [--force] old.json new.json
+
+run generates a folder per size in a scratch directory, times list_due_ideas,
+create_new_idea, postpone_idea, delete_idea, compact_trash and perform_backup
+headlessly, and writes latency percentiles plus read()/write() call and byte
+counts (syscr/syscw/rchar/wchar from /proc/self/io, Linux only) to a JSON file.
+Directory listing and stat calls are not counted. compare prints the p50/p95 change
+between two such files so versions can be checked for regressions; it refuses
+runs whose workload parameters differ unless given --force.
+Your real options file is never touched.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import idea_manager
+import tracing
+
+DISTRIBUTIONS = {
+    # Days relative to today for each generated idea
+    'uniform': lambda rng: rng.randint(-365, 365),
+    'past': lambda rng: -int(rng.expovariate(1 / 60)),
+    'future': lambda rng: int(rng.expovariate(1 / 60)) + 1,
+    'bursty': lambda rng: rng.choice((-30, -7, 0, 1, 7, 30, 90)) + rng.randint(-1, 1),
+}
+
+
+def _read_proc_io():
+    try:
+        with open('/proc/self/io') as f:
+            return {k: int(v) for k, v in (line.split(':') for line in f)}
+    except OSError:
+        return {}
+
+
+def _proc_io_overhead():
+    """Counter deltas caused by reading /proc/self/io itself, to subtract per sample"""
+    before = _read_proc_io()
+    after = _read_proc_io()
+    return {key: after[key] - before[key] for key in before}
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    k = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[k]
+
+
+def _text(rng, mean_bytes):
+    n = max(1, int(rng.gauss(mean_bytes, mean_bytes / 4)))
+    return ('lorem ipsum dolor sit amet ' * (n // 27 + 1))[:n]
+
+
+def generate_folder(folder, count, distribution, text_bytes, deleted_ratio, sharded, seed):
+    """Write count ideas (and count * deleted_ratio deleted ones) straight to disk"""
+    rng = random.Random(seed)
+    pick_days = DISTRIBUTIONS[distribution]
+    today = datetime.date.today()
+    os.makedirs(folder, exist_ok=True)
+    if sharded:
+        with open(os.path.join(folder, idea_manager.SHARD_MARKER), 'w') as f:
+            f.write('YYYY/MM\n')
+
+    used = {}
+
+    def next_name(date_obj):
+        base = date_obj.strftime('%Y%m%d')
+        n = used.get(base, 0) + 1
+        used[base] = n
+        return f"{base}.txt" if n == 1 else f"{base}_{n}.txt"
+
+    made_dirs = set()
+    for _ in range(count):
+        date_obj = today + datetime.timedelta(days=pick_days(rng))
+        target = folder
+        if sharded:
+            target = os.path.join(folder, date_obj.strftime('%Y'), date_obj.strftime('%m'))
+            if target not in made_dirs:
+                os.makedirs(target, exist_ok=True)
+                made_dirs.add(target)
+        with open(os.path.join(target, next_name(date_obj)), 'w') as f:
+            f.write(_text(rng, text_bytes))
+
+    deleted_dir = os.path.join(folder, 'deleted_ideas')
+    os.makedirs(deleted_dir, exist_ok=True)
+    now = time.time()
+    for _ in range(int(count * deleted_ratio)):
+        date_obj = today + datetime.timedelta(days=rng.randint(-730, 0))
+        path = os.path.join(deleted_dir, next_name(date_obj))
+        with open(path, 'w') as f:
+            f.write(_text(rng, text_bytes))
+        deleted_at = now - rng.randint(0, 365) * 86400
+        os.utime(path, (deleted_at, deleted_at))
+
+
+def _measure(fn, repeat, setup=None):
+    """Run fn(i) repeat times and return latency and IO stats.
+
+    setup(i), if given, runs before each sample and is excluded from the stats.
+    """
+    latencies = []
+    overhead = _proc_io_overhead()
+    io_totals = {}
+    faults = block_in = block_out = 0
+    for i in range(repeat):
+        if setup:
+            setup(i)
+        io_before = _read_proc_io()
+        ru_before = resource.getrusage(resource.RUSAGE_SELF)
+        start = time.perf_counter()
+        fn(i)
+        latencies.append(time.perf_counter() - start)
+        io_after = _read_proc_io()
+        ru_after = resource.getrusage(resource.RUSAGE_SELF)
+        for key in io_before:
+            delta = io_after[key] - io_before[key] - overhead.get(key, 0)
+            io_totals[key] = io_totals.get(key, 0) + max(0, delta)
+        faults += ru_after.ru_minflt - ru_before.ru_minflt
+        block_in += ru_after.ru_inblock - ru_before.ru_inblock
+        block_out += ru_after.ru_oublock - ru_before.ru_oublock
+    latencies.sort()
+    stats = {
+        'repeat': repeat,
+        'p50_ms': _percentile(latencies, 50) * 1000,
+        'p90_ms': _percentile(latencies, 90) * 1000,
+        'p95_ms': _percentile(latencies, 95) * 1000,
+        'p99_ms': _percentile(latencies, 99) * 1000,
+        'max_ms': latencies[-1] * 1000,
+        'mean_ms': sum(latencies) / len(latencies) * 1000,
+        'minor_faults': faults,
+        'block_in': block_in,
+        'block_out': block_out,
+    }
+    for key in ('syscr', 'syscw', 'rchar', 'wchar', 'read_bytes', 'write_bytes'):
+        if key in io_totals:
+            stats[key] = io_totals[key] / repeat
+    return stats
+
+
+def bench_folder(folder, args, rng):
+    results = {}
+    repeat = args.repeat
+
+    results['list_due_ideas'] = _measure(lambda i: idea_manager.list_due_ideas(folder), repeat)
+
+    results['create_new_idea'] = _measure(
+        lambda i: idea_manager.create_new_idea(folder, 'benchmark idea', rng.randint(0, 60)), repeat)
+
+    due = idea_manager.list_due_ideas(folder)
+    rng.shuffle(due)
+    n = min(repeat, len(due) // 2)
+    if n:
+        to_postpone, to_delete = due[:n], due[n:2 * n]
+        results['postpone_idea'] = _measure(
+            lambda i: idea_manager.postpone_idea(to_postpone[i], rng.randint(1, 60), folder), n)
+        results['delete_idea'] = _measure(
+            lambda i: idea_manager.delete_idea(to_delete[i], folder), n)
+
+    # Compaction changes the trash, so each sample gets a fresh copy of it (copytree keeps mtimes)
+    compact_root = tempfile.mkdtemp(prefix='compact-', dir=args.workdir)
+
+    def copy_trash(i):
+        scratch = os.path.join(compact_root, str(i))
+        shutil.copytree(os.path.join(folder, 'deleted_ideas'), os.path.join(scratch, 'deleted_ideas'))
+
+    results['compact_trash'] = _measure(
+        lambda i: idea_manager.compact_trash(os.path.join(compact_root, str(i)), 30),
+        args.backup_repeat, setup=copy_trash)
+    shutil.rmtree(compact_root, ignore_errors=True)
+
+    backup_root = tempfile.mkdtemp(prefix='backup-', dir=args.workdir)
+
+    def backup(i):
+        # Retention high enough that compaction never fires, so every sample copies the same tree
+        options = {'ideas_folder': folder, 'backup_folder': os.path.join(backup_root, str(i)),
+                   'trash_retention_days': 100 * 365}
+        idea_manager.perform_backup(options, show_prompts=False)
+
+    results['perform_backup'] = _measure(backup, args.backup_repeat)
+    shutil.rmtree(backup_root, ignore_errors=True)
+    return results
+
+
+def _git_version():
+    try:
+        return subprocess.run(['git', 'describe', '--always', '--dirty'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def cmd_run(args):
+    os.makedirs(args.workdir, exist_ok=True)
+    # perform_backup saves options; keep that away from the user's real file
+    options_path = os.path.join(args.workdir, 'options.json')
+    idea_manager.get_options_path = lambda: options_path
+    tracing.configure({'log_level': 'WARNING'})
+
+    report = {
+        'version': _git_version(),
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'platform': platform.platform(),
+        'python': platform.python_version(),
+        'params': {k: v for k, v in vars(args).items() if k != 'func'},
+        'runs': [],
+    }
+    for size in args.sizes:
+        folder = os.path.join(args.workdir, f"ideas-{size}-{args.distribution}-{args.layout}")
+        shutil.rmtree(folder, ignore_errors=True)
+        print(f"Generating {size} ideas in {folder}")
+        start = time.perf_counter()
+        generate_folder(folder, size, args.distribution, args.text_bytes, args.deleted_ratio,
+                        args.layout == 'sharded', args.seed)
+        print(f"  generated in {time.perf_counter() - start:.1f}s, benchmarking")
+        results = bench_folder(folder, args, random.Random(args.seed))
+        report['runs'].append({'size': size, 'results': results})
+        for op, stats in results.items():
+            print(f"  {op:16} p50 {stats['p50_ms']:9.3f} ms  p95 {stats['p95_ms']:9.3f} ms"
+                  f"  read() {stats.get('syscr', 0):9.0f}  write() {stats.get('syscw', 0):7.0f}")
+        if not args.keep:
+            shutil.rmtree(folder, ignore_errors=True)
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+    return 0
+
+
+# Parameters that change the workload; runs differing in these are not comparable
+WORKLOAD_PARAMS = ('distribution', 'layout', 'text_bytes', 'deleted_ratio', 'repeat', 'backup_repeat', 'seed')
+
+
+def cmd_compare(args):
+    with open(args.old) as f:
+        old = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+    old_params, new_params = old.get('params', {}), new.get('params', {})
+    differing = [key for key in WORKLOAD_PARAMS if old_params.get(key) != new_params.get(key)]
+    if differing:
+        for key in differing:
+            print(f"{key}: {old_params.get(key)!r} -> {new_params.get(key)!r}", file=sys.stderr)
+        if not args.force:
+            print("Runs used different workloads, so the numbers are not comparable (use --force to compare anyway)",
+                  file=sys.stderr)
+            return 1
+        print("Warning: comparing runs with different workloads", file=sys.stderr)
+    print(f"{old.get('version')} -> {new.get('version')}")
+    old_runs = {run['size']: run['results'] for run in old['runs']}
+    for run in new['runs']:
+        before = old_runs.get(run['size'])
+        if not before:
+            continue
+        print(f"size {run['size']}")
+        for op, stats in run['results'].items():
+            if op not in before:
+                continue
+            line = f"  {op:16}"
+            for key in ('p50_ms', 'p95_ms'):
+                a, b = before[op][key], stats[key]
+                change = (b - a) / a * 100 if a else 0.0
+                line += f"  {key[:3]} {a:9.3f} -> {b:9.3f} ms ({change:+6.1f}%)"
+            print(line)
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark Boomerang idea operations")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('run', help="generate synthetic folders and time each operation")
+    p.add_argument('--sizes', type=lambda s: [int(x) for x in s.split(',')], default=[1000, 10000],
+                   help="comma-separated idea counts (default 1000,10000)")
+    p.add_argument('--distribution', choices=sorted(DISTRIBUTIONS), default='uniform',
+                   help="due date distribution (default uniform)")
+    p.add_argument('--text-bytes', type=int, default=200, help="mean idea size in bytes (default 200)")
+    p.add_argument('--deleted-ratio', type=float, default=1.0,
+                   help="deleted ideas per live idea (default 1.0)")
+    p.add_argument('--layout', choices=('flat', 'sharded'), default='flat')
+    p.add_argument('--repeat', type=int, default=50, help="samples per operation (default 50)")
+    p.add_argument('--backup-repeat', type=int, default=3, help="perform_backup samples (default 3)")
+    p.add_argument('--seed', type=int, default=1)
+    p.add_argument('--workdir', default=os.path.join(tempfile.gettempdir(), 'boomerang-bench'))
+    p.add_argument('--keep', action='store_true', help="keep generated folders")
+    p.add_argument('--output', default='bench.json')
+    p.set_defaults(func=cmd_run)
+
+    p = sub.add_parser('compare', help="compare two result files")
+    p.add_argument('old')
+    p.add_argument('new')
+    p.add_argument('--force', action='store_true', help="compare even if the workload parameters differ")
+    p.set_defaults(func=cmd_compare)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
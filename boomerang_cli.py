@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""Maintenance commands for a Boomerang ideas folder.
+
+Usage:  python boomerang_cli.py migrate [FOLDER]
+        python boomerang_cli.py compact-trash [--days N] [FOLDER]
+        python boomerang_cli.py restore NAME [FOLDER]
+        python boomerang_cli.py sync [--dry-run] [MIRROR] [FOLDER]
+        python boomerang_cli.py import [--format F] FILE [FOLDER]
+        python boomerang_cli.py export [--format F] [--due-only] FILE [FOLDER]
+FOLDER defaults to the ideas folder from the options file.
+
+migrate moves a flat ideas folder into the sharded YYYY/MM/ layout. It is safe
+to run while the app is open, and safe to re-run if it was interrupted.
+compact-trash rolls old deleted ideas into monthly archives, and restore brings
+one back (from the live trash or an archive) under its original due date.
+sync does a two-way delta sync with a mirror folder (default: the mirror_folder
+option), see mirror_sync.py.
+import and export stream ideas from/to JSONL, CSV or Markdown (see bulk_io.py);
+FILE may be - for stdin/stdout.
+"""
+import argparse
+import contextlib
+import sys
+
+from idea_manager import (load_options, get_ideas_folder, migrate_to_sharded, compact_trash,
+                          restore_deleted_idea)
+from mirror_sync import sync_folders
+from bulk_io import FORMATS, guess_format, import_ideas, export_ideas
+
+
+def _resolve_folder(folder):
+    folder = folder or get_ideas_folder(load_options())
+    if not folder:
+        print("No ideas folder given and none set in options.")
+        sys.exit(1)
+    return folder
+
+
+def cmd_migrate(args):
+    folder = _resolve_folder(args.folder)
+
+    def progress(done, total):
+        if done % 1000 == 0 or done == total:
+            print(f"  {done}/{total}")
+
+    try:
+        migrate_to_sharded(folder, progress=progress)
+    except FileNotFoundError as e:
+        print(e)
+        return 1
+    return 0
+
+
+def cmd_compact_trash(args):
+    folder = _resolve_folder(args.folder)
+    days = args.days if args.days is not None else load_options().get('trash_retention_days', 30)
+    compact_trash(folder, days)
+    return 0
+
+
+def cmd_restore(args):
+    folder = _resolve_folder(args.folder)
+    if not restore_deleted_idea(folder, args.name):
+        print(f"No deleted idea named {args.name}")
+        return 1
+    return 0
+
+
+def cmd_sync(args):
+    folder = _resolve_folder(args.folder)
+    mirror = args.mirror or load_options().get('mirror_folder')
+    if not mirror:
+        print("No mirror folder given and none set in options.")
+        return 1
+    try:
+        plan = sync_folders(folder, mirror, dry_run=args.dry_run)
+    except FileNotFoundError as e:
+        print(e)
+        return 1
+    if args.dry_run:
+        for side, src, dst in plan['renames']:
+            print(f"  rename {side}: {src} -> {dst}")
+        for from_side, to_side, src, dst in plan['copies']:
+            print(f"  copy {from_side}:{src} -> {to_side}:{dst}")
+        for side, rel in plan['deletes']:
+            print(f"  delete {side}: {rel}")
+    for rel in plan['conflicts']:
+        print(f"Conflict: {rel} (local change kept; a conflicting mirror edit is saved alongside)")
+    return 0
+
+
+def _open_stream(path, mode):
+    if path == '-':
+        return contextlib.nullcontext(sys.stdin if mode == 'r' else sys.stdout)
+    return open(path, mode, newline='', encoding='utf-8')
+
+
+def cmd_import(args):
+    folder = _resolve_folder(args.folder)
+    fmt = args.format or guess_format(args.file)
+
+    def progress(imported, failed):
+        print(f"  {imported} imported, {failed} failed", file=sys.stderr)
+
+    try:
+        with _open_stream(args.file, 'r') as f:
+            imported, failures = import_ideas(folder, f, fmt, progress=progress, progress_every=10000)
+    except (OSError, ValueError) as e:
+        print(e, file=sys.stderr)
+        return 1
+    for lineno, reason in failures[:20]:
+        print(f"  line {lineno}: {reason}", file=sys.stderr)
+    if len(failures) > 20:
+        print(f"  ... and {len(failures) - 20} more", file=sys.stderr)
+    print(f"Imported {imported} ideas, {len(failures)} failed", file=sys.stderr)
+    return 2 if failures else 0
+
+
+def cmd_export(args):
+    folder = _resolve_folder(args.folder)
+    fmt = args.format or (guess_format(args.file) if args.file != '-' else 'jsonl')
+    if fmt not in FORMATS:
+        # Checked before opening so a typo never truncates an existing file
+        print(f"Unknown format {fmt!r}, expected one of {', '.join(FORMATS)}", file=sys.stderr)
+        return 1
+    try:
+        with _open_stream(args.file, 'w') as out:
+            count = export_ideas(folder, out, fmt, due_only=args.due_only)
+    except (OSError, ValueError) as e:
+        print(e, file=sys.stderr)
+        return 1
+    print(f"Exported {count} ideas", file=sys.stderr)
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Boomerang maintenance commands")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('migrate', help="move a flat ideas folder into YYYY/MM/ shards")
+    p.add_argument('folder', nargs='?', help="ideas folder (defaults to the configured one)")
+    p.set_defaults(func=cmd_migrate)
+
+    p = sub.add_parser('compact-trash', help="archive deleted ideas older than N days")
+    p.add_argument('--days', type=int, help="age threshold (default: trash_retention_days option or 30)")
+    p.add_argument('folder', nargs='?', help="ideas folder (defaults to the configured one)")
+    p.set_defaults(func=cmd_compact_trash)
+
+    p = sub.add_parser('restore', help="restore a deleted idea by file name")
+    p.add_argument('name', help="file name of the deleted idea, e.g. 20240105_2.txt")
+    p.add_argument('folder', nargs='?', help="ideas folder (defaults to the configured one)")
+    p.set_defaults(func=cmd_restore)
+
+    p = sub.add_parser('sync', help="two-way delta sync with a mirror folder")
+    p.add_argument('--dry-run', action='store_true', help="print the plan without changing anything")
+    p.add_argument('mirror', nargs='?', help="mirror folder (defaults to the mirror_folder option)")
+    p.add_argument('folder', nargs='?', help="ideas folder (defaults to the configured one)")
+    p.set_defaults(func=cmd_sync)
+
+    p = sub.add_parser('import', help="bulk import ideas from JSONL, CSV or Markdown")
+    p.add_argument('--format', choices=FORMATS, help="input format (default: from the file extension)")
+    p.add_argument('file', help="input file, or - for stdin")
+    p.add_argument('folder', nargs='?', help="ideas folder (defaults to the configured one)")
+    p.set_defaults(func=cmd_import)
+
+    p = sub.add_parser('export', help="export ideas to JSONL, CSV or Markdown")
+    p.add_argument('--format', choices=FORMATS, help="output format (default: from the file extension)")
+    p.add_argument('--due-only', action='store_true', help="only export ideas that are due")
+    p.add_argument('file', help="output file, or - for stdout")
+    p.add_argument('folder', nargs='?', help="ideas folder (defaults to the configured one)")
+    p.set_defaults(func=cmd_export)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
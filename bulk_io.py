@@ -0,0 +1,239 @@
+"""Streaming bulk import and export of ideas.
+
+Supported formats, chosen by file extension or explicitly:
+
+- jsonl: one {"text": ..., "due": "YYYY-MM-DD"} object per line ("days": N
+  from today may be given instead of "due");
+- csv: a header row with text and due (or days) columns;
+- md: each idea starts with a heading whose text is its due date
+  ("## 2024-01-05"); everything up to the next such heading is the idea. Lines
+  of an idea that look like such a heading are exported with a leading
+  backslash, which import removes again. Text before the first heading is
+  reported as a failure.
+
+Records flow through generators as (line number, text, due date, error), so
+memory stays flat however big the input is.
+Names are allocated in memory after a single listing of each target directory,
+instead of probing the disk for every idea like create_new_idea does. Bad records
+are collected as failures instead of raising or showing dialogs.
+"""
+import csv
+import datetime
+import json
+import locale
+import os
+import re
+
+from idea_manager import is_sharded, list_all_ideas, notify_idea_listeners
+from tracing import log, traced
+
+FORMATS = ('jsonl', 'csv', 'md')
+_MD_HEADING = re.compile(r'^#{1,6}\s+(\d{4}-?\d{2}-?\d{2})\s*$')
+_MD_HEADING_ESCAPED = re.compile(r'^\\*#{1,6}\s+\d{4}-?\d{2}-?\d{2}\s*$')
+
+
+def guess_format(path):
+    ext = os.path.splitext(path)[1].lower().lstrip('.')
+    return {'json': 'jsonl', 'ndjson': 'jsonl', 'markdown': 'md'}.get(ext, ext)
+
+
+def _parse_due(due=None, days=None):
+    if due not in (None, ''):
+        due = str(due).strip()
+        for fmt in ('%Y-%m-%d', '%Y%m%d'):
+            try:
+                return datetime.datetime.strptime(due, fmt).date()
+            except ValueError:
+                pass
+        raise ValueError(f"bad due date {due!r}")
+    if days not in (None, ''):
+        try:
+            return datetime.date.today() + datetime.timedelta(days=int(days))
+        except (ValueError, TypeError, OverflowError):
+            raise ValueError(f"bad days value {days!r}") from None
+    raise ValueError("missing due date")
+
+
+def _record(lineno, text, due, days):
+    """Validate one record into a (lineno, text, due, error) tuple"""
+    if text is None:
+        return lineno, None, None, "missing text"
+    if not isinstance(text, str):
+        return lineno, None, None, f"text must be a string, not {type(text).__name__}"
+    try:
+        return lineno, text, _parse_due(due, days), None
+    except ValueError as e:
+        return lineno, None, None, str(e)
+
+
+def read_jsonl(f):
+    for lineno, line in enumerate(f, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield lineno, None, None, f"bad JSON: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield lineno, None, None, "expected a JSON object"
+            continue
+        yield _record(lineno, record.get('text'), record.get('due'), record.get('days'))
+
+
+def read_csv(f):
+    reader = csv.DictReader(f)
+    if reader.fieldnames is not None and 'text' not in reader.fieldnames:
+        raise ValueError("CSV header has no text column")
+    for lineno, row in enumerate(reader, 2):
+        yield _record(lineno, row.get('text'), row.get('due'), row.get('days'))
+
+
+def _md_escape(text):
+    """Add a backslash to lines that would be read back as a date heading (or as an escaped one)"""
+    return ''.join('\\' + line if _MD_HEADING_ESCAPED.match(line) else line for line in text.splitlines(True))
+
+
+def read_markdown(f):
+    due, start, lines = None, None, []
+    seen_heading = stray_reported = False
+    for lineno, line in enumerate(f, 1):
+        match = _MD_HEADING.match(line)
+        if match:
+            seen_heading = True
+            if due is not None:
+                yield start, ''.join(lines).strip('\n'), due, None
+            try:
+                due, start, lines = _parse_due(match.group(1)), lineno, []
+            except ValueError as e:
+                yield lineno, None, None, str(e)
+                due = None
+        elif due is not None:
+            lines.append(line[1:] if _MD_HEADING_ESCAPED.match(line) else line)
+        elif not seen_heading and line.strip() and not stray_reported:
+            yield lineno, None, None, "text before the first date heading (## YYYY-MM-DD) was skipped"
+            stray_reported = True
+    if due is not None:
+        yield start, ''.join(lines).strip('\n'), due, None
+
+
+READERS = {'jsonl': read_jsonl, 'csv': read_csv, 'md': read_markdown}
+
+
+class _NameAllocator:
+    """Hands out YYYYMMDD[_n].txt names after listing each target directory once"""
+
+    def __init__(self, ideas_folder):
+        self.ideas_folder = ideas_folder
+        self.sharded = is_sharded(ideas_folder)
+        self.used = {}  # directory -> set of names
+        self.next_idx = {}  # (directory, base) -> next suffix to try
+
+    def _directory(self, date_obj):
+        if not self.sharded:
+            return self.ideas_folder
+        return os.path.join(self.ideas_folder, date_obj.strftime('%Y'), date_obj.strftime('%m'))
+
+    def allocate(self, date_obj):
+        directory = self._directory(date_obj)
+        used = self.used.get(directory)
+        if used is None:
+            os.makedirs(directory, exist_ok=True)
+            used = self.used[directory] = set(os.listdir(directory))
+        base = date_obj.strftime('%Y%m%d')
+        idx = self.next_idx.get((directory, base), 1)
+        name = f"{base}.txt" if idx == 1 else f"{base}_{idx}.txt"
+        while name in used:
+            idx += 1
+            name = f"{base}_{idx}.txt"
+        used.add(name)
+        self.next_idx[(directory, base)] = idx + 1
+        return os.path.join(directory, name)
+
+
+@traced()
+def import_ideas(ideas_folder, f, fmt, progress=None, progress_every=1000):
+    """Create an idea for every record read from the open file f.
+
+    Returns (imported_paths_count, failures) where failures is a list of
+    (line number, reason). Nothing is shown to the user; the caller reports.
+    """
+    if fmt not in READERS:
+        raise ValueError(f"Unknown format {fmt!r}, expected one of {', '.join(FORMATS)}")
+    allocator = _NameAllocator(ideas_folder)
+    # Same bytes the app's text-mode writes would produce, encoded before any file exists
+    encoding = locale.getpreferredencoding(False)
+    imported, failures, seen = 0, [], 0
+    for lineno, text, due, error in READERS[fmt](f):
+        seen += 1
+        if error is None:
+            try:
+                data = text.replace('\n', os.linesep).encode(encoding)
+            except UnicodeEncodeError as e:
+                error = f"text cannot be saved as {encoding}: {e.reason}"
+        if error is not None:
+            failures.append((lineno, error))
+        else:
+            while True:
+                path = allocator.allocate(due)
+                try:
+                    # 'x' so an idea created concurrently by the app is never overwritten
+                    out = open(path, 'xb')
+                except FileExistsError:
+                    continue
+                except OSError as e:
+                    failures.append((lineno, str(e)))
+                    break
+                try:
+                    with out:
+                        out.write(data)
+                    imported += 1
+                except OSError as e:
+                    # Never leave a partial idea behind
+                    os.remove(path)
+                    failures.append((lineno, str(e)))
+                break
+        if progress and seen % progress_every == 0:
+            progress(imported, len(failures))
+    if progress:
+        progress(imported, len(failures))
+    log.info(f"Imported {imported} ideas into {ideas_folder} ({len(failures)} failed)")
+    if imported:
+        # One notification for the whole batch rather than one per idea
+        notify_idea_listeners('bulk', ideas_folder)
+    return imported, failures
+
+
+def _iter_ideas(ideas_folder, due_only):
+    paths = list_all_ideas(ideas_folder)
+    today = datetime.date.today().strftime('%Y%m%d')
+    for path in paths:
+        name = os.path.basename(path)
+        if due_only and name[:8] > today:
+            break  # Sorted by date, so nothing later is due
+        with open(path, 'r') as f:
+            text = f.read()
+        yield name, f"{name[:4]}-{name[4:6]}-{name[6:8]}", text
+
+
+@traced()
+def export_ideas(ideas_folder, out, fmt, due_only=False, progress=None, progress_every=1000):
+    """Stream ideas to the open file out. Returns the number exported."""
+    if fmt not in READERS:
+        raise ValueError(f"Unknown format {fmt!r}, expected one of {', '.join(FORMATS)}")
+    writer = csv.writer(out) if fmt == 'csv' else None
+    if writer:
+        writer.writerow(['due', 'text', 'file'])
+    count = 0
+    for name, due, text in _iter_ideas(ideas_folder, due_only):
+        if fmt == 'jsonl':
+            out.write(json.dumps({'due': due, 'text': text, 'file': name}) + '\n')
+        elif fmt == 'csv':
+            writer.writerow([due, text, name])
+        else:
+            out.write(f"## {due}\n\n{_md_escape(text.rstrip())}\n\n")
+        count += 1
+        if progress and count % progress_every == 0:
+            progress(count)
+    log.info(f"Exported {count} ideas from {ideas_folder}")
+    return count
@@ -1,17 +1,47 @@
 import os
 import json
+import re
 
 import datetime
 import traceback
 import shutil
 import threading
 import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
 
 from PySide6.QtWidgets import QMessageBox
 
+from tracing import log, mark_failed, span, traced
+
+SHARD_MARKER = '.boomerang_sharded'
+TRASH_INDEX = 'index.json'
+PREVIEW_CHARS = 100_000  # Larger ideas are shown truncated until edited
+IDEA_CHUNK_CHARS = 256 * 1024
+SCAN_WORKERS = 4
+SCAN_TIMEOUT = 60  # Seconds before a folder scan is reported as empty
+
+_listeners = []
+
+def add_idea_listener(callback):
+    """Register callback(event, *paths) for idea changes made through this module.
+
+    Events: 'created' (path), 'deleted' (path), 'moved' (old_path, new_path) and
+    'bulk' (ideas_folder) after a bulk import. Callbacks may run on any thread.
+    """
+    _listeners.append(callback)
+
+def notify_idea_listeners(event, *args):
+    for callback in _listeners:
+        try:
+            callback(event, *args)
+        except Exception as e:
+            log.error(f"Idea listener failed on {event}: {e}\n{traceback.format_exc()}")
+
 def get_options_path():
     return os.path.expanduser('~/.boomerang_options.json')
 
+@traced()
 def load_options():
     path = get_options_path()
     if not os.path.exists(path):
@@ -19,21 +49,24 @@ def load_options():
     try:
         with open(path, 'r') as f:
             options = json.load(f)
-        print(f"Loaded options: {options}")
+        log.debug(f"Loaded options: {options}")
         return options
     except Exception as e:
-        print(f"Error loading options: {e}\n{traceback.format_exc()}")
+        mark_failed()
+        log.error(f"Error loading options: {e}\n{traceback.format_exc()}")
         QMessageBox.critical(None, "Error", f"Failed to load options: {e}\n{traceback.format_exc()}")
         return {}
 
+@traced()
 def save_options(options):
     path = get_options_path()
     try:
         with open(path, 'w') as f:
             json.dump(options, f, indent=4)
-        print(f"Saved options: {options}")
+        log.debug(f"Saved options: {options}")
     except Exception as e:
-        print(f"Error saving options: {e}\n{traceback.format_exc()}")
+        mark_failed()
+        log.error(f"Error saving options: {e}\n{traceback.format_exc()}")
         QMessageBox.critical(None, "Error", f"Failed to save options: {e}\n{traceback.format_exc()}")
 
 def get_ideas_folder(options):
@@ -43,42 +76,230 @@ def set_ideas_folder(options, folder):
     options['ideas_folder'] = folder
     save_options(options)
 
-def list_due_ideas(ideas_folder):
-    if not ideas_folder or not os.path.exists(ideas_folder):
-        return []
-    files = [f for f in os.listdir(ideas_folder) if f.endswith('.txt')]
-    files.sort()  # Alphabetical = chronological
+def get_ideas_folders(options):
+    """Return every configured folder as {'path', 'backup_folder'}, primary first.
+
+    The primary folder is ideas_folder/backup_folder (where new ideas are logged);
+    extra_ideas_folders holds any others, each with its own backup folder.
+    """
+    folders = []
+    if options.get('ideas_folder'):
+        folders.append({'path': options['ideas_folder'], 'backup_folder': options.get('backup_folder')})
+    for extra in options.get('extra_ideas_folders', []):
+        if extra.get('path'):
+            folders.append({'path': extra['path'], 'backup_folder': extra.get('backup_folder')})
+    return folders
+
+def is_sharded(ideas_folder):
+    """Sharded folders keep ideas under YYYY/MM/ and are marked by SHARD_MARKER"""
+    return os.path.exists(os.path.join(ideas_folder, SHARD_MARKER))
+
+def _idea_dir(date_obj, ideas_folder):
+    if not is_sharded(ideas_folder):
+        return ideas_folder
+    shard = os.path.join(ideas_folder, date_obj.strftime('%Y'), date_obj.strftime('%m'))
+    os.makedirs(shard, exist_ok=True)
+    return shard
+
+def _due_files_in(folder, today):
     due = []
-    today = datetime.date.today()
-    for f in files:
+    for f in os.listdir(folder):
+        if not f.endswith('.txt'):
+            continue
         try:
-            date_str = f[:8]
-            file_date = datetime.datetime.strptime(date_str, '%Y%m%d').date()
+            file_date = datetime.datetime.strptime(f[:8], '%Y%m%d').date()
             if file_date <= today:
-                due.append(os.path.join(ideas_folder, f))
+                due.append((f, os.path.join(folder, f)))
         except ValueError:
-            print(f"Invalid filename format: {f}")
-    print(f"Found {len(due)} due ideas")
+            log.warning(f"Invalid filename format: {f}")
+    return due
+
+def _due_shard_dirs(ideas_folder, today):
+    """Yield the YYYY/MM shards that can only contain ideas due on or before today"""
+    for year in sorted(os.listdir(ideas_folder)):
+        if not (len(year) == 4 and year.isdigit()) or int(year) > today.year:
+            continue
+        year_dir = os.path.join(ideas_folder, year)
+        if not os.path.isdir(year_dir):
+            continue
+        for month in sorted(os.listdir(year_dir)):
+            if not (len(month) == 2 and month.isdigit()):
+                continue
+            if int(year) == today.year and int(month) > today.month:
+                continue
+            month_dir = os.path.join(year_dir, month)
+            if os.path.isdir(month_dir):
+                yield month_dir
+
+def _list_ideas(ideas_folder, until):
+    if not ideas_folder or not os.path.exists(ideas_folder):
+        return []
+    ideas = []
+    if is_sharded(ideas_folder):
+        for shard in _due_shard_dirs(ideas_folder, until):
+            ideas.extend(_due_files_in(shard, until))
+    # Flat files are always scanned, and last, so a folder stays usable mid-migration:
+    # an idea migrated between the two listings is then seen in neither rather than twice
+    sharded = {name: path for name, path in ideas}
+    for name, path in _due_files_in(ideas_folder, until):
+        if name in sharded and _same_idea(path, sharded[name]):
+            continue  # Caught between link and unlink in _move_no_clobber
+        ideas.append((name, path))
+    ideas.sort()  # Alphabetical = chronological
+    return [path for _, path in ideas]
+
+def _same_idea(path, other):
+    try:
+        return os.path.samefile(path, other)
+    except OSError:
+        return True  # One of them is gone, so they were the same idea mid-move
+
+@traced()
+def list_due_ideas(ideas_folder):
+    due = _list_ideas(ideas_folder, datetime.date.today())
+    log.debug(f"Found {len(due)} due ideas")
     return due
 
-def load_idea(file_path):
+@traced()
+def list_all_ideas(ideas_folder):
+    """Every idea in the folder, due or not, in date order"""
+    return _list_ideas(ideas_folder, datetime.date.max)
+
+_scan_pool = None
+_scan_lock = threading.Lock()
+_scans_in_flight = {}  # (fn, folder) -> future
+
+def _scan_folders(folders, fn, callback, timeout, empty):
+    """Run fn(folder) for each folder on the shared pool and report callback(folder, result).
+
+    A folder whose previous scan with fn is still running (a hung network share,
+    say) is not scanned again; the caller is handed that scan's result instead,
+    so a stuck folder ties up at most one worker. If a folder has not reported
+    within timeout seconds, or its scan fails, callback gets empty for it and a
+    late result is dropped, so callers always hear back from every folder.
+    """
+    global _scan_pool
+    with _scan_lock:
+        if _scan_pool is None:
+            _scan_pool = ThreadPoolExecutor(max_workers=SCAN_WORKERS, thread_name_prefix='scan')
+
+    def scan(key, folder):
+        try:
+            return fn(folder)
+        except Exception as e:
+            log.error(f"Error scanning {folder}: {e}\n{traceback.format_exc()}")
+            return empty
+        finally:
+            with _scan_lock:
+                _scans_in_flight.pop(key, None)
+
+    def watch(folder, future):
+        reported = threading.Event()
+        lock = threading.Lock()
+
+        def report(result):
+            with lock:
+                if reported.is_set():
+                    return
+                reported.set()
+            timer.cancel()
+            callback(folder, result)
+
+        def timed_out():
+            log.warning(f"Scan of {folder} timed out after {timeout}s")
+            report(empty)
+
+        timer = threading.Timer(timeout, timed_out)
+        timer.daemon = True
+        timer.start()
+        future.add_done_callback(lambda f: report(f.result()))
+
+    futures = []
+    for folder in folders:
+        key = (fn, os.path.abspath(folder))
+        with _scan_lock:
+            future = _scans_in_flight.get(key)
+            if future is None:
+                future = _scans_in_flight[key] = _scan_pool.submit(scan, key, folder)
+            else:
+                log.info(f"Scan of {folder} still running, waiting for it instead of starting another")
+        watch(folder, future)
+        futures.append(future)
+    return futures
+
+def scan_due_ideas(folders, callback, timeout=SCAN_TIMEOUT):
+    """Run list_due_ideas for each folder on a thread pool.
+
+    callback(folder, due_paths) is called from a pool thread as each folder
+    finishes, so a slow folder never holds back the others. A folder that fails
+    or times out reports an empty list (see _scan_folders). Returns the futures.
+    """
+    return _scan_folders(folders, list_due_ideas, callback, timeout, [])
+
+def scan_idea_counts(folders, callback, timeout=SCAN_TIMEOUT):
+    """Like scan_due_ideas, but reports count_ideas_by_date(folder) (or {})"""
+    return _scan_folders(folders, count_ideas_by_date, callback, timeout, {})
+
+def count_ideas_by_date(ideas_folder):
+    """Return {date: number of ideas due that day} for every idea in the folder"""
+    counts = {}
+    for path in list_all_ideas(ideas_folder):
+        name = os.path.basename(path)
+        day = datetime.date(int(name[:4]), int(name[4:6]), int(name[6:8]))
+        counts[day] = counts.get(day, 0) + 1
+    return counts
+
+def merge_due_ideas(*queues):
+    """Merge due (path, folder) lists into one queue ordered by due date"""
+    merged = [item for queue in queues for item in queue]
+    merged.sort(key=lambda item: os.path.basename(item[0]))
+    return merged
+
+@traced()
+def load_idea_preview(file_path, max_chars=None):
+    """Read at most max_chars of an idea without reading the rest of the file.
+
+    Returns (text, truncated, size_bytes).
+    """
+    max_chars = max_chars or PREVIEW_CHARS
     try:
         with open(file_path, 'r') as f:
-            text = f.read()
-        print(f"Loaded idea from {file_path}: {text[:50]}...")
-        return text
+            size = os.fstat(f.fileno()).st_size
+            text = f.read(max_chars)
+            truncated = bool(f.read(1))
+        log.debug(f"Loaded preview of {file_path} ({len(text)} chars of {size} bytes)")
+        return text, truncated, size
     except Exception as e:
-        print(f"Error loading idea {file_path}: {e}\n{traceback.format_exc()}")
+        mark_failed()
+        log.error(f"Error loading idea {file_path}: {e}\n{traceback.format_exc()}")
         QMessageBox.critical(None, "Error", f"Failed to load idea: {e}\n{traceback.format_exc()}")
-        return ''
+        return '', False, 0
 
+def iter_idea_chunks(file_path, chunk_chars=IDEA_CHUNK_CHARS):
+    """Yield an idea's text in chunks so large ideas can be rendered incrementally"""
+    with open(file_path, 'r') as f:
+        while True:
+            chunk = f.read(chunk_chars)
+            if not chunk:
+                return
+            yield chunk
+
+@traced()
 def save_idea(file_path, text):
     try:
-        with open(file_path, 'w') as f:
+        # 'r+' rather than 'w' so an idea moved away (migrated, postponed, deleted)
+        # since it was opened is never recreated next to its new copy
+        with open(file_path, 'r+') as f:
             f.write(text)
-        print(f"Saved idea to {file_path}")
+            f.truncate()
+        log.info(f"Saved idea to {file_path}")
+    except FileNotFoundError:
+        mark_failed()
+        log.error(f"Not saving {file_path}: it was moved or deleted since it was opened")
+        QMessageBox.critical(None, "Error", "Failed to save idea: it was moved or deleted since it was opened.")
     except Exception as e:
-        print(f"Error saving idea {file_path}: {e}\n{traceback.format_exc()}")
+        mark_failed()
+        log.error(f"Error saving idea {file_path}: {e}\n{traceback.format_exc()}")
         QMessageBox.critical(None, "Error", f"Failed to save idea: {e}\n{traceback.format_exc()}")
 
 def _generate_unique_filename(date_obj, ideas_folder):
@@ -90,46 +311,316 @@ def _generate_unique_filename(date_obj, ideas_folder):
         filename = f"{base}_{idx}.txt"
     return filename
 
+def _new_idea_path(date_obj, ideas_folder):
+    folder = _idea_dir(date_obj, ideas_folder)
+    return os.path.join(folder, _generate_unique_filename(date_obj, folder))
+
+def _move_no_clobber(src, dst):
+    """Move src to dst unless dst exists. Returns False if dst was taken.
+
+    os.rename silently replaces dst on POSIX, so link + unlink is used instead;
+    link fails with EEXIST. Filesystems without hard links fall back to rename.
+    """
+    try:
+        os.link(src, dst)
+    except FileExistsError:
+        return False
+    except FileNotFoundError:
+        raise
+    except OSError:
+        if os.path.exists(dst):
+            return False
+        os.rename(src, dst)
+        return True
+    os.unlink(src)
+    return True
+
+def _claim_new_idea_path(date_obj, ideas_folder):
+    """Create an empty file under a fresh name and return its path"""
+    while True:
+        path = _new_idea_path(date_obj, ideas_folder)
+        try:
+            with open(path, 'x'):
+                return path
+        except FileExistsError:
+            continue  # Taken since we probed; try the next name
 
+@traced()
 def delete_idea(file_path, ideas_folder):
     deleted_dir = os.path.join(ideas_folder, 'deleted_ideas')
     os.makedirs(deleted_dir, exist_ok=True)
     try:
-        shutil.move(file_path, os.path.join(deleted_dir, os.path.basename(file_path)))
-        print(f"Moved {file_path} to deleted_ideas")
+        name = os.path.basename(file_path)
+        n = 1
+        dest = os.path.join(deleted_dir, name)
+        # Same-day ideas reuse names, so never replace an earlier deleted one
+        while not _move_no_clobber(file_path, dest):
+            n += 1
+            dest = os.path.join(deleted_dir, _trash_name(name, n))
+        os.utime(dest)  # mtime records when it was deleted, for compact_trash
+        log.info(f"Moved {file_path} to deleted_ideas")
+        notify_idea_listeners('deleted', file_path)
     except Exception as e:
-        print(f"Error deleting idea {file_path}: {e}\n{traceback.format_exc()}")
+        mark_failed()
+        log.error(f"Error deleting idea {file_path}: {e}\n{traceback.format_exc()}")
         QMessageBox.critical(None, "Error", f"Failed to delete idea: {e}\n{traceback.format_exc()}")
 
+@traced()
 def postpone_idea(file_path, days, ideas_folder):
     try:
         new_date = datetime.date.today() + datetime.timedelta(days=days)
-        new_filename = _generate_unique_filename(new_date, ideas_folder)
-        new_path = os.path.join(ideas_folder, new_filename)
-        os.rename(file_path, new_path)
-        print(f"Postponed {file_path} to {new_path}")
+        new_path = _new_idea_path(new_date, ideas_folder)
+        while not _move_no_clobber(file_path, new_path):
+            new_path = _new_idea_path(new_date, ideas_folder)
+        log.info(f"Postponed {file_path} to {new_path}")
+        notify_idea_listeners('moved', file_path, new_path)
     except Exception as e:
-        print(f"Error postponing idea {file_path}: {e}\n{traceback.format_exc()}")
+        mark_failed()
+        log.error(f"Error postponing idea {file_path}: {e}\n{traceback.format_exc()}")
         QMessageBox.critical(None, "Error", f"Failed to postpone idea: {e}\n{traceback.format_exc()}")
 
+@traced()
 def create_new_idea(ideas_folder, text, days):
     try:
         target_date = datetime.date.today() + datetime.timedelta(days=days)
-        filename = _generate_unique_filename(target_date, ideas_folder)
-        file_path = os.path.join(ideas_folder, filename)
+        file_path = _claim_new_idea_path(target_date, ideas_folder)
         save_idea(file_path, text)
-        print(f"Created new idea {file_path}")
+        log.info(f"Created new idea {file_path}")
+        notify_idea_listeners('created', file_path)
         return file_path
     except Exception as e:
-        print(f"Error creating new idea: {e}\n{traceback.format_exc()}")
+        mark_failed()
+        log.error(f"Error creating new idea: {e}\n{traceback.format_exc()}")
         QMessageBox.critical(None, "Error", f"Failed to create new idea: {e}\n{traceback.format_exc()}")
         return None
 
+# Sharded layout migration
+@traced()
+def migrate_to_sharded(ideas_folder, progress=None):
+    """Move flat YYYYMMDD*.txt ideas into YYYY/MM/ shards.
+
+    The marker is written first so new ideas land in shards straight away, and
+    each idea is moved without ever replacing a file. The app can keep running while this
+    is in progress, and an interrupted migration is resumed by running it again.
+    Returns the number of ideas moved.
+    """
+    if not os.path.isdir(ideas_folder):
+        raise FileNotFoundError(f"Ideas folder not found: {ideas_folder}")
+    marker = os.path.join(ideas_folder, SHARD_MARKER)
+    if not os.path.exists(marker):
+        with open(marker, 'w') as f:
+            f.write('YYYY/MM\n')
+        log.info(f"Marked {ideas_folder} as sharded")
+
+    pending = sorted(f for f in os.listdir(ideas_folder) if f.endswith('.txt'))
+    moved = 0
+    for i, f in enumerate(pending):
+        try:
+            moved += _migrate_one(ideas_folder, f)
+        finally:
+            if progress:
+                progress(i + 1, len(pending))
+    log.info(f"Migrated {moved} ideas in {ideas_folder} to sharded layout")
+    return moved
+
+def _migrate_one(ideas_folder, f):
+    src = os.path.join(ideas_folder, f)
+    try:
+        file_date = datetime.datetime.strptime(f[:8], '%Y%m%d').date()
+    except ValueError:
+        log.warning(f"Skipping invalid filename: {f}")
+        return 0
+    shard = _idea_dir(file_date, ideas_folder)
+    dst = os.path.join(shard, f)
+    try:
+        while not _move_no_clobber(src, dst):
+            # Name was taken by an idea created in the shard during migration
+            dst = os.path.join(shard, _generate_unique_filename(file_date, shard))
+    except FileNotFoundError:
+        # Deleted or postponed by the running app since we listed the folder
+        return 0
+    return 1
+
+# Trash compaction
+def _trash_name(name, n):
+    """name for the n-th deleted idea called name: 20240105.txt, 20240105~2.txt, ..."""
+    return name if n == 1 else f"{name[:-4]}~{n}.txt"
+
+def _trash_key(filename):
+    """Original idea name of a trash file or archive member"""
+    return re.sub(r'~\d+(?=\.txt$)', '', filename)
+
+def _load_trash_index(archive_dir):
+    path = os.path.join(archive_dir, TRASH_INDEX)
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def _save_trash_index(archive_dir, index):
+    path = os.path.join(archive_dir, TRASH_INDEX)
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(index, f, indent=1)
+    os.replace(tmp, path)
+
+@traced()
+def compact_trash(ideas_folder, older_than_days=30):
+    """Roll deleted ideas older than the threshold into monthly zip archives.
+
+    Archives are deleted_ideas/archive/YYYY-MM.zip, grouped by deletion month,
+    with index.json mapping each original idea name to every archive member
+    holding a deleted idea of that name.
+    Archives are replaced atomically and files are only removed once the index
+    is written, so re-running after an interruption just finishes the job. Returns the number of ideas archived.
+    """
+    deleted_dir = os.path.join(ideas_folder, 'deleted_ideas')
+    if not os.path.isdir(deleted_dir):
+        return 0
+    archive_dir = os.path.join(deleted_dir, 'archive')
+    os.makedirs(archive_dir, exist_ok=True)
+    index = _load_trash_index(archive_dir)
+    cutoff = time.time() - older_than_days * 86400
+
+    by_month = {}
+    for entry in os.scandir(deleted_dir):
+        if not entry.is_file() or not entry.name.endswith('.txt'):
+            continue
+        mtime = entry.stat().st_mtime
+        if mtime >= cutoff:
+            continue
+        month = datetime.datetime.fromtimestamp(mtime).strftime('%Y-%m')
+        by_month.setdefault(month, []).append((entry.name, entry.path, mtime))
+
+    archived = 0
+    for month, entries in sorted(by_month.items()):
+        try:
+            done = _archive_month(archive_dir, f"{month}.zip", entries, index)
+        except zipfile.BadZipFile as e:
+            log.error(f"Skipping trash month {month}, its archive is unreadable: {e}")
+            continue
+        _save_trash_index(archive_dir, index)
+        for path in done:
+            os.remove(path)
+        archived += len(done)
+    log.info(f"Compacted {archived} deleted ideas into {archive_dir}")
+    return archived
+
+def _archive_month(archive_dir, archive_name, entries, index):
+    """Add entries to one monthly archive and index. Returns the trash paths now archived.
+
+    The archive is rebuilt in a temporary file and swapped in with os.replace, so
+    a crash never leaves a corrupt zip. Each member's comment records the file
+    and deletion time it came from, so a run interrupted between writing the zip
+    and the index re-indexes those members instead of adding them again.
+    """
+    archive_path = os.path.join(archive_dir, archive_name)
+    archived = {}  # (file, deleted) -> member, from earlier runs
+    members = set()
+    if os.path.exists(archive_path):
+        with zipfile.ZipFile(archive_path) as zf:
+            for info in zf.infolist():
+                members.add(info.filename)
+                try:
+                    meta = json.loads(info.comment)
+                    archived[(meta['file'], meta['deleted'])] = info.filename
+                except (ValueError, KeyError, TypeError):
+                    pass
+
+    done, to_write = [], []
+    for name, path, mtime in entries:
+        key = _trash_key(name)
+        records = index.setdefault(key, [])
+        if any(r.get('file') == name and r['deleted'] == mtime for r in records):
+            # Archived and indexed by an earlier run that was interrupted before cleanup
+            done.append(path)
+            continue
+        member = archived.get((name, mtime))
+        if member is None:
+            n = 1
+            member = key
+            while member in members:
+                n += 1
+                member = _trash_name(key, n)
+            members.add(member)
+            to_write.append((name, path, mtime, member))
+        records.append({'archive': archive_name, 'member': member, 'file': name, 'deleted': mtime})
+        done.append(path)
+
+    if to_write:
+        tmp = archive_path + '.tmp'
+        if os.path.exists(archive_path):
+            shutil.copyfile(archive_path, tmp)
+        else:
+            with zipfile.ZipFile(tmp, 'w'):
+                pass
+        with zipfile.ZipFile(tmp, 'a', zipfile.ZIP_DEFLATED) as zf:
+            for name, path, mtime, member in to_write:
+                zf.write(path, member)
+                zf.getinfo(member).comment = json.dumps({'file': name, 'deleted': mtime}).encode('utf-8')
+        os.replace(tmp, archive_path)
+    return done
+
+def find_deleted_idea(ideas_folder, name):
+    """Return index records for an archived idea name, newest deletion last"""
+    archive_dir = os.path.join(ideas_folder, 'deleted_ideas', 'archive')
+    return sorted(_load_trash_index(archive_dir).get(name, []), key=lambda r: r['deleted'])
+
+@traced()
+def restore_deleted_idea(ideas_folder, name):
+    """Bring a deleted idea back under its original due date.
+
+    name is the idea's file name; an exact trash name such as 20240105~2.txt
+    picks one of several deleted ideas that shared a name. Looks in the live
+    trash first, then in the archives, taking the most recent deletion.
+    Returns the restored path, or None if nothing by that name was deleted.
+    """
+    deleted_dir = os.path.join(ideas_folder, 'deleted_ideas')
+    try:
+        due_date = datetime.datetime.strptime(name[:8], '%Y%m%d').date()
+    except ValueError:
+        due_date = datetime.date.today()
+
+    live = os.path.join(deleted_dir, name)
+    if not os.path.exists(live) and os.path.isdir(deleted_dir):
+        matches = [e for e in os.scandir(deleted_dir) if e.is_file() and _trash_key(e.name) == name]
+        if matches:
+            live = max(matches, key=lambda e: e.stat().st_mtime).path
+    if os.path.exists(live):
+        dest = _new_idea_path(due_date, ideas_folder)
+        while not _move_no_clobber(live, dest):
+            dest = _new_idea_path(due_date, ideas_folder)
+        log.info(f"Restored {os.path.basename(live)} to {dest}")
+        notify_idea_listeners('created', dest)
+        return dest
+
+    key = _trash_key(name)
+    records = find_deleted_idea(ideas_folder, key)
+    if key != name:
+        records = [r for r in records if r.get('file') == name] or records
+    if not records:
+        return None
+    record = records[-1]
+    archive_dir = os.path.join(deleted_dir, 'archive')
+    with zipfile.ZipFile(os.path.join(archive_dir, record['archive'])) as zf:
+        data = zf.read(record['member'])
+    dest = _claim_new_idea_path(due_date, ideas_folder)
+    with open(dest, 'wb') as f:
+        f.write(data)
+    # Leave the archive member in place; just forget it so it is not restored twice
+    index = _load_trash_index(archive_dir)
+    index[key] = [r for r in index.get(key, []) if r != record]
+    if not index[key]:
+        del index[key]
+    _save_trash_index(archive_dir, index)
+    log.info(f"Restored {name} from {record['archive']} to {dest}")
+    notify_idea_listeners('created', dest)
+    return dest
+
 # Backup functionality
 def should_backup(options):
     """Check if backup is due based on last backup time and interval"""
-    backup_folder = options.get('backup_folder')
-    if not backup_folder:
+    if not any(f.get('backup_folder') for f in get_ideas_folders(options)):
         return False
         
     interval_days = options.get('backup_interval_days', 7)
@@ -152,15 +643,44 @@ def should_backup(options):
     except ValueError:
         return True
 
+@traced()
 def perform_backup(options, show_prompts=True):
-    """Perform backup if conditions are met"""
-    backup_folder = options.get('backup_folder')
-    ideas_folder = options.get('ideas_folder')
-    
-    if not backup_folder or not ideas_folder:
-        print("Backup skipped: backup_folder or ideas_folder not set")
+    """Perform backup of every configured folder that has a backup folder"""
+    targets = [f for f in get_ideas_folders(options) if f.get('backup_folder')]
+    if not targets:
+        log.warning("Backup skipped: backup_folder or ideas_folder not set")
         return False
-        
+
+    backed_up = False
+    for folder, subdir in zip(targets, _backup_subdirs(targets)):
+        with span('backup_folder', folder=folder['path']):
+            backed_up |= _backup_folder(folder['path'], folder['backup_folder'], options, show_prompts, subdir)
+    if backed_up:
+        # Update last backup info
+        options['last_backup_date'] = datetime.date.today().strftime('%Y%m%d')
+        options['last_backup_time'] = time.time()
+        save_options(options)
+    return backed_up
+
+def _backup_subdirs(targets):
+    """Subdirectory of <backup>/<YYYYMMDD>/ for each target, or None if it has the backup folder to itself.
+
+    Folders sharing a backup folder each get their own subdirectory, named after
+    the ideas folder (with its position appended if two names clash).
+    """
+    by_backup = {}
+    for i, folder in enumerate(targets):
+        by_backup.setdefault(os.path.abspath(folder['backup_folder']), []).append(i)
+    subdirs = [None] * len(targets)
+    for indexes in by_backup.values():
+        if len(indexes) < 2:
+            continue
+        names = [os.path.basename(os.path.normpath(targets[i]['path'])) for i in indexes]
+        for i, name in zip(indexes, names):
+            subdirs[i] = name if names.count(name) == 1 else f"{name}_{i + 1}"
+    return subdirs
+
+def _backup_folder(ideas_folder, backup_folder, options, show_prompts, subdir=None):
     # Check if backup folder exists
     if not os.path.exists(backup_folder):
         if show_prompts:
@@ -175,9 +695,10 @@ def perform_backup(options, show_prompts=True):
                 return False
         try:
             os.makedirs(backup_folder, exist_ok=True)
-            print(f"Created backup folder: {backup_folder}")
+            log.info(f"Created backup folder: {backup_folder}")
         except Exception as e:
-            print(f"Failed to create backup folder: {e}")
+            mark_failed()
+            log.error(f"Failed to create backup folder: {e}")
             if show_prompts:
                 QMessageBox.critical(None, "Backup Error", f"Failed to create backup folder: {e}")
             return False
@@ -185,28 +706,67 @@ def perform_backup(options, show_prompts=True):
     # Create today's backup folder
     today_str = datetime.date.today().strftime('%Y%m%d')
     today_backup = os.path.join(backup_folder, today_str)
+    if subdir:
+        today_backup = os.path.join(today_backup, subdir)
     
     if os.path.exists(today_backup):
-        print(f"Backup already exists for today: {today_backup}")
+        log.info(f"Backup already exists for today: {today_backup}")
         return False
-        
+
+    # Keep the trash small before it is copied
     try:
-        # Copy ideas folder to backup
-        shutil.copytree(ideas_folder, today_backup)
-        print(f"Backup completed: {today_backup}")
-        
-        # Update last backup info
-        options['last_backup_date'] = today_str
-        options['last_backup_time'] = time.time()
-        save_options(options)
-        
+        compact_trash(ideas_folder, options.get('trash_retention_days', 30))
+    except Exception as e:
+        log.error(f"Trash compaction failed: {e}")
+
+    try:
+        # Copy ideas folder to backup, sharing unchanged trash archives with the last one
+        previous = _previous_backup(backup_folder, today_str, subdir)
+        archive_dir = os.path.normpath(os.path.join(ideas_folder, 'deleted_ideas', 'archive'))
+
+        def copy(src, dst):
+            if previous and src.endswith('.zip') and os.path.normpath(os.path.dirname(src)) == archive_dir:
+                old = os.path.join(previous, 'deleted_ideas', 'archive', os.path.basename(src))
+                if _same_contents(src, old):
+                    try:
+                        os.link(old, dst)
+                        return dst
+                    except OSError:
+                        pass
+            return shutil.copy2(src, dst)
+
+        shutil.copytree(ideas_folder, today_backup, copy_function=copy)
+        log.info(f"Backup completed: {today_backup}")
         return True
     except Exception as e:
-        print(f"Backup failed: {e}")
+        mark_failed()
+        log.error(f"Backup failed: {e}")
         if show_prompts:
             QMessageBox.critical(None, "Backup Error", f"Backup failed: {e}")
         return False
 
+def _previous_backup(backup_folder, today_str, subdir=None):
+    """Most recent earlier <backup>/<YYYYMMDD>[/subdir] backup of the same folder, or None"""
+    days = sorted((d for d in os.listdir(backup_folder) if len(d) == 8 and d.isdigit() and d < today_str),
+                  reverse=True)
+    for day in days:
+        path = os.path.join(backup_folder, day, subdir) if subdir else os.path.join(backup_folder, day)
+        if os.path.isdir(path):
+            return path
+    return None
+
+def _same_contents(path, other):
+    """True if other looks like an unchanged copy of path (copy2 keeps mtimes).
+
+    Archives are only ever replaced (see _archive_month), never modified in
+    place, so linking to an earlier backup's copy can't change it later.
+    """
+    try:
+        a, b = os.stat(path), os.stat(other)
+    except OSError:
+        return False
+    return a.st_size == b.st_size and a.st_mtime_ns == b.st_mtime_ns
+
 def start_backup_thread(options):
     """Start background thread to check for backups every 12 hours"""
     def backup_worker():
@@ -217,8 +777,8 @@ def start_backup_thread(options):
                 if should_backup(current_options):
                     perform_backup(current_options, show_prompts=True)
             except Exception as e:
-                print(f"Backup thread error: {e}")
+                log.error(f"Backup thread error: {e}")
     
     backup_thread = threading.Thread(target=backup_worker, daemon=True)
     backup_thread.start()
-    print("Backup thread started") 
\ No newline at end of file
+    log.info("Backup thread started") 
\ No newline at end of file
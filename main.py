@@ -6,11 +6,13 @@ from PySide6.QtWidgets import (QApplication, QSystemTrayIcon, QMenu, QMessageBox
 from PySide6.QtGui import QIcon, QAction
 from PySide6.QtNetwork import QLocalServer
 
-from idea_manager import load_options, save_options, get_ideas_folder, set_ideas_folder, list_due_ideas, start_backup_thread, perform_backup
-from ui import ProcessWindow, AddIdeaWindow, OptionsWindow
+from idea_manager import load_options, save_options, get_ideas_folder, set_ideas_folder, get_ideas_folders, start_backup_thread, perform_backup
+from ui import ProcessWindow, AddIdeaWindow, OptionsWindow, DiagnosticsWindow, DueScanner, DueCounter, badge_icon
+import tracing
+from tracing import log, span
 def handle_exception(exc_type, exc_value, exc_traceback):
     error_msg = ''.join(traceback.format_exception(exc_type, exc_value, exc_traceback))
-    print(error_msg)
+    log.error(error_msg)
     QMessageBox.critical(None, "Unexpected Error", error_msg)
 
 sys.excepthook = handle_exception
@@ -26,12 +28,12 @@ if __name__ == '__main__':
             from AppKit import NSApplication, NSApplicationActivationPolicyAccessory
             NSApplication.sharedApplication().setActivationPolicy_(NSApplicationActivationPolicyAccessory)
         except Exception as e:
-            print(e)
-            traceback.print_exc()
+            log.error(f"{e}\n{traceback.format_exc()}")
 
     # Tray Icon
     tray = QSystemTrayIcon()
-    tray.setIcon(QIcon('icon.png'))
+    tray_icon = QIcon('icon.png')
+    tray.setIcon(tray_icon)
     tray.setVisible(True)
 
     menu = QMenu()
@@ -39,21 +41,25 @@ if __name__ == '__main__':
     log_new_action = QAction("Log New Idea")
     backup_now_action = QAction("Backup Now")
     options_action = QAction("Options")
+    diagnostics_action = QAction("Diagnostics")
     quit_action = QAction("Quit")
     menu.addAction(bring_back_action)
     menu.addAction(log_new_action)
     menu.addSeparator()
     menu.addAction(backup_now_action)
     menu.addAction(options_action)
+    menu.addAction(diagnostics_action)
     menu.addSeparator()
     menu.addAction(quit_action)
     tray.setContextMenu(menu)
 
-    # Keep references to windows to prevent garbage collection
+    # Keep references to windows and in-flight scans to prevent garbage collection
     open_windows = []
+    active_scans = []
 
     # Load options and handle startup
     options = load_options()
+    tracing.configure(options)
     ideas_folder = get_ideas_folder(options)
     if not ideas_folder:
         folder = QFileDialog.getExistingDirectory(None, "Select Ideas Folder")
@@ -66,7 +72,7 @@ if __name__ == '__main__':
         reply = QMessageBox.question(None, "Folder Not Found", f"The ideas folder '{ideas_folder}' does not exist. Create it?", QMessageBox.Yes | QMessageBox.No)
         if reply == QMessageBox.Yes:
             os.makedirs(ideas_folder, exist_ok=True)
-            print(f"Created folder {ideas_folder}")
+            log.info(f"Created folder {ideas_folder}")
         else:
             folder = QFileDialog.getExistingDirectory(None, "Select Ideas Folder")
             if folder:
@@ -75,9 +81,35 @@ if __name__ == '__main__':
             else:
                 sys.exit(0)
 
+    # Live due count in the tray, kept current from idea events and a midnight timer
+    def update_due_count(count):
+        tray.setIcon(badge_icon(tray_icon, count))
+        tray.setToolTip(f"Boomerang: {count} idea{'s' if count != 1 else ''} due")
+        bring_back_action.setText(f"Bring it back ({count})" if count else "Bring it back")
+
+    due_counter = DueCounter([f['path'] for f in get_ideas_folders(options)])
+    due_counter.changed.connect(update_due_count)
+    # Cheap date check whenever the count is about to be seen, in case the midnight timer was late
+    menu.aboutToShow.connect(due_counter.check_date)
+    tray.activated.connect(lambda reason: due_counter.check_date())
+
     def open_process_window():
-        if list_due_ideas(ideas_folder):
-            window = ProcessWindow(ideas_folder)
+        with span('open_process_window'):
+            _open_process_window()
+
+    def _open_process_window():
+        # Open on the first folder with due ideas; slower folders are merged in as they finish
+        scanner = DueScanner([f['path'] for f in get_ideas_folders(options)])
+        state = {'window': None}
+
+        def on_scanned(folder, paths):
+            if state['window'] is not None:
+                state['window'].add_due_ideas(folder, paths)
+                return
+            if not paths:
+                return
+            window = ProcessWindow(folder, due_items=[(path, folder) for path in paths])
+            state['window'] = window
             open_windows.append(window)
             window.show()
             try:
@@ -85,11 +117,23 @@ if __name__ == '__main__':
                 window.activateWindow()
             except Exception:
                 pass
-        else:
-            QMessageBox.information(None, "No Ideas", "No ideas to process today.")
+
+        def on_finished():
+            active_scans.remove(scanner)
+            if state['window'] is None:
+                QMessageBox.information(None, "No Ideas", "No ideas to process today.")
+
+        scanner.folder_scanned.connect(on_scanned)
+        scanner.finished.connect(on_finished)
+        active_scans.append(scanner)
+        scanner.start()
 
     def open_add_window():
-        print("Opening add window")
+        with span('open_add_window'):
+            _open_add_window()
+
+    def _open_add_window():
+        log.debug("Opening add window")
         window = AddIdeaWindow(ideas_folder)
         open_windows.append(window)
         window.show()
@@ -97,7 +141,7 @@ if __name__ == '__main__':
             window.raise_()
             window.activateWindow()
         except Exception as e:
-            print(e)
+            log.warning(e)
             pass
 
     def backup_now():
@@ -111,15 +155,22 @@ if __name__ == '__main__':
             # Update ideas_folder if it changed
             if dialog.selected_folder:
                 ideas_folder = dialog.selected_folder
+            tracing.configure(options)
+            due_counter.set_folders([f['path'] for f in get_ideas_folders(options)])
+
+    def open_diagnostics():
+        window = DiagnosticsWindow()
+        open_windows.append(window)
+        window.show()
 
     # ------- IPC server for global hotkey -------
     ipc_server = QLocalServer()
     # If server name already exists from previous crash, remove it
     QLocalServer.removeServer("boomerang_ipc")
     if not ipc_server.listen("boomerang_ipc"):
-        print("Failed to start IPC server", ipc_server.errorString())
+        log.error(f"Failed to start IPC server {ipc_server.errorString()}")
     else:
-        print("IPC server listening for commands")
+        log.info("IPC server listening for commands")
 
     def _ipc_handle_new_connection():
         socket = ipc_server.nextPendingConnection()
@@ -128,11 +179,13 @@ if __name__ == '__main__':
         socket.readyRead.connect(lambda s=socket: _ipc_read_socket(s))
 
     def _ipc_read_socket(sock):
-        data = bytes(sock.readAll()).decode().strip()
-        print(f"IPC received: {data}")
-        if data == 'log':
-            open_add_window()
-        sock.disconnectFromServer()
+        with span('ipc', command=None) as fields:
+            data = bytes(sock.readAll()).decode().strip()
+            fields['command'] = data[:20]
+            log.info(f"IPC received: {data[:20]}")
+            if data == 'log':
+                open_add_window()
+            sock.disconnectFromServer()
 
     ipc_server.newConnection.connect(_ipc_handle_new_connection)
 
@@ -140,10 +193,11 @@ if __name__ == '__main__':
     log_new_action.triggered.connect(open_add_window)
     backup_now_action.triggered.connect(backup_now)
     options_action.triggered.connect(open_options)
+    diagnostics_action.triggered.connect(open_diagnostics)
     quit_action.triggered.connect(app.quit)
 
     # Start backup thread
     start_backup_thread(options)
 
-    print("Boomerang app started")
+    log.info("Boomerang app started")
     sys.exit(app.exec()) 
\ No newline at end of file
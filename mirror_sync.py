@@ -0,0 +1,290 @@
+"""Two-way delta sync between an ideas folder and a mirror folder.
+
+Each side keeps a manifest of relative path -> [size, mtime_ns, sha1] as of its
+last sync with the other side. Manifests are named after the peer folder, so
+syncing with a different mirror starts afresh, and both carry the same sync id.
+If one is missing or the ids differ (a new, replaced or wiped mirror), both are
+ignored and the first sync is a full diff in which nothing is deleted.
+
+A sync walks both trees, re-hashing only files whose size or mtime changed,
+diffs each side against its own manifest and then only touches the files that
+changed:
+
+- a change on one side is copied (or deleted) on the other;
+- a file that vanished and reappeared under a new name with the same hash is a
+  rename (postpone_idea, delete_idea), and is replayed as a rename;
+- a path changed differently on both sides is a conflict: the local version
+  keeps the path and the mirror's version is kept next to it as another idea
+  with the same due date (or, in the trash, as another ~n deleted idea). A
+  delete loses against an edit;
+- an idea moved differently on both sides (say, postponed to different dates)
+  is a conflict too: the local move wins and is replayed on the mirror.
+
+Trash archives (deleted_ideas/archive) are not synced; each side compacts its
+own trash, so a deleted idea that leaves one side's trash is not removed from
+the other's.
+
+Operations are applied in batches (renames, then copies, then deletes) and both
+manifests are written once at the end.
+"""
+import hashlib
+import json
+import os
+import shutil
+import uuid
+
+from idea_manager import _trash_key, _trash_name
+from tracing import log, span, traced
+
+MANIFEST_PREFIX = '.boomerang_manifest'
+TRASH_DIR = 'deleted_ideas'
+_EXCLUDED_DIRS = (TRASH_DIR + '/archive',)
+
+
+def _excluded(rel):
+    return any(rel == d or rel.startswith(d + '/') for d in _EXCLUDED_DIRS)
+
+
+def _in_trash(rel):
+    return rel.startswith(TRASH_DIR + '/')
+
+
+def _manifest_path(root, peer):
+    peer_id = hashlib.sha1(os.path.realpath(peer).encode('utf-8')).hexdigest()[:16]
+    return os.path.join(root, f"{MANIFEST_PREFIX}-{peer_id}.json")
+
+
+def load_manifest(root, peer):
+    """Return (sync_id, files) recorded in root for its last sync with peer"""
+    path = _manifest_path(root, peer)
+    if not os.path.exists(path):
+        return None, {}
+    with open(path, 'r') as f:
+        data = json.load(f)
+    return data.get('sync_id'), data.get('files', {})
+
+
+def save_manifest(root, peer, sync_id, files):
+    path = _manifest_path(root, peer)
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump({'peer': os.path.realpath(peer), 'sync_id': sync_id, 'files': files}, f,
+                  separators=(',', ':'))
+    os.replace(tmp, path)
+
+
+def _hash_file(path):
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _entry(root, rel, known_hash=None):
+    st = os.stat(os.path.join(root, rel))
+    return [st.st_size, st.st_mtime_ns, known_hash or _hash_file(os.path.join(root, rel))]
+
+
+def scan_tree(root, previous):
+    """Return the current manifest of root, reusing hashes of unchanged files"""
+    current = {}
+    hashed = 0
+    for dirpath, dirnames, filenames in os.walk(root):
+        rel_dir = os.path.relpath(dirpath, root).replace(os.sep, '/')
+        dirnames[:] = [d for d in dirnames if not _excluded(d if rel_dir == '.' else f"{rel_dir}/{d}")]
+        for name in filenames:
+            if name.startswith(MANIFEST_PREFIX) or name.endswith('.synctmp'):
+                continue
+            full = os.path.join(dirpath, name)
+            rel = os.path.relpath(full, root).replace(os.sep, '/')
+            st = os.stat(full)
+            old = previous.get(rel)
+            if old and old[0] == st.st_size and old[1] == st.st_mtime_ns:
+                current[rel] = old
+            else:
+                current[rel] = [st.st_size, st.st_mtime_ns, _hash_file(full)]
+                hashed += 1
+    log.debug(f"Scanned {root}: {len(current)} files, {hashed} hashed")
+    return current
+
+
+def _changes(old, new):
+    """Return {path: new hash or None} for paths whose content changed"""
+    changes = {}
+    for rel, entry in new.items():
+        before = old.get(rel)
+        if not before or before[2] != entry[2]:
+            changes[rel] = entry[2]
+    for rel in old:
+        if rel not in new:
+            changes[rel] = None
+    return changes
+
+
+def _detect_renames(changes, old):
+    """Pull (src, dst) pairs out of changes where a removed file reappeared under a new name"""
+    removed_by_hash = {}
+    for rel, h in changes.items():
+        if h is None:
+            removed_by_hash.setdefault(old[rel][2], []).append(rel)
+    renames = []
+    for rel, h in list(changes.items()):
+        if h is None or rel in old:
+            continue
+        candidates = removed_by_hash.get(h)
+        if candidates:
+            src = candidates.pop()
+            renames.append((src, rel))
+            del changes[src]
+            del changes[rel]
+    return renames
+
+
+def _conflict_name(rel, local, mirror):
+    """Pick a free name for the losing side of a conflict, present on neither side"""
+    directory, name = os.path.split(rel)
+    stem, ext = os.path.splitext(name)
+    base = stem.split('_')[0] if stem[:8].isdigit() else stem + '_conflict'
+    idx = 1
+    while True:
+        idx += 1
+        if _in_trash(rel) and ext == '.txt':
+            # Trash files are told apart as name~n.txt (see idea_manager._trash_name)
+            candidate = _trash_name(_trash_key(name), idx)
+        else:
+            candidate = f"{base}_{idx}{ext}"
+        candidate_rel = f"{directory}/{candidate}" if directory else candidate
+        if candidate_rel not in local and candidate_rel not in mirror:
+            return candidate_rel
+
+
+def plan_sync(local_old, local_new, mirror_old, mirror_new):
+    """Work out the operations needed to bring both sides together.
+
+    Returns a dict of op lists: renames [(side, src, dst)], copies
+    [(from_side, to_side, src, dst)], deletes [(side, path)] and conflicts [path].
+    """
+    sides = {'local': (local_old, local_new), 'mirror': (mirror_old, mirror_new)}
+    changes = {side: _changes(old, new) for side, (old, new) in sides.items()}
+    plan = {'renames': [], 'copies': [], 'deletes': [], 'conflicts': []}
+
+    renames = {side: dict(_detect_renames(changes[side], old)) for side, (old, new) in sides.items()}
+    for src in sorted(set(renames['local']) & set(renames['mirror'])):
+        local_dst, mirror_dst = renames['local'].pop(src), renames['mirror'].pop(src)
+        if local_dst == mirror_dst:
+            continue  # Both sides made the same move
+        if local_dst not in mirror_new:
+            # Moved differently on each side: keep the local move and replay it on the mirror
+            plan['renames'].append(('mirror', mirror_dst, local_dst))
+            plan['conflicts'].append(src)
+        else:
+            for side, dst in (('local', local_dst), ('mirror', mirror_dst)):
+                changes[side][dst] = sides[side][1][dst][2]
+                changes[side][src] = None
+
+    for side, other in (('local', 'mirror'), ('mirror', 'local')):
+        old, new = sides[side]
+        other_new = sides[other][1]
+        for src, dst in renames[side].items():
+            untouched = src not in changes[other] and dst not in changes[other]
+            if untouched and other_new.get(src, [None] * 3)[2] == old[src][2] and dst not in other_new:
+                plan['renames'].append((other, src, dst))
+            else:
+                # The other side moved on; fall back to copy + delete for these paths
+                changes[side][dst] = new[dst][2]
+                changes[side][src] = None
+
+    for rel in sorted(set(changes['local']) | set(changes['mirror'])):
+        in_local, in_mirror = rel in changes['local'], rel in changes['mirror']
+        if in_local and in_mirror:
+            a, b = changes['local'][rel], changes['mirror'][rel]
+            if a == b:
+                continue
+            if a is None:
+                plan['copies'].append(('mirror', 'local', rel, rel))
+            elif b is None:
+                plan['copies'].append(('local', 'mirror', rel, rel))
+            else:
+                keep_as = _conflict_name(rel, local_new, mirror_new)
+                local_new[keep_as] = mirror_new[keep_as] = None  # Reserve the name
+                plan['copies'].append(('mirror', 'local', rel, keep_as))
+                plan['copies'].append(('mirror', 'mirror', rel, keep_as))
+                plan['copies'].append(('local', 'mirror', rel, rel))
+                plan['conflicts'].append(rel)
+            continue
+        side, other = ('local', 'mirror') if in_local else ('mirror', 'local')
+        if changes[side][rel] is None:
+            # Trash leaves one side by compaction into that side's own archive, so keep the other's copy
+            if rel in sides[other][1] and not _in_trash(rel):
+                plan['deletes'].append((other, rel))
+        else:
+            plan['copies'].append((side, other, rel, rel))
+    for manifest in (local_new, mirror_new):
+        for rel in [rel for rel, entry in manifest.items() if entry is None]:
+            del manifest[rel]
+    return plan
+
+
+def _apply(plan, roots, manifests):
+    """Apply a plan in batches, keeping the in-memory manifests in step"""
+    for side, src, dst in plan['renames']:
+        root = roots[side]
+        os.makedirs(os.path.dirname(os.path.join(root, dst)), exist_ok=True)
+        os.rename(os.path.join(root, src), os.path.join(root, dst))
+        entry = manifests[side].pop(src)
+        manifests[side][dst] = _entry(root, dst, entry[2])
+
+    # Conflict copies read the mirror's version before it is overwritten, so keep list order
+    for from_side, to_side, src, dst in plan['copies']:
+        src_path = os.path.join(roots[from_side], src)
+        dst_path = os.path.join(roots[to_side], dst)
+        os.makedirs(os.path.dirname(dst_path), exist_ok=True)
+        known_hash = manifests[from_side][src][2]
+        tmp = dst_path + '.synctmp'
+        shutil.copy2(src_path, tmp)
+        os.replace(tmp, dst_path)
+        manifests[to_side][dst] = _entry(roots[to_side], dst, known_hash)
+
+    for side, rel in plan['deletes']:
+        try:
+            os.remove(os.path.join(roots[side], rel))
+        except FileNotFoundError:
+            pass
+        manifests[side].pop(rel, None)
+
+
+@traced()
+def sync_folders(local_root, mirror_root, dry_run=False):
+    """Sync local_root and mirror_root both ways. Returns the plan that was applied."""
+    if not os.path.isdir(local_root):
+        raise FileNotFoundError(f"Ideas folder not found: {local_root}")
+    os.makedirs(mirror_root, exist_ok=True)
+
+    with span('sync_scan'):
+        local_id, local_old = load_manifest(local_root, mirror_root)
+        mirror_id, mirror_old = load_manifest(mirror_root, local_root)
+        # Manifests written before archives were excluded may still list them
+        local_old = {rel: entry for rel, entry in local_old.items() if not _excluded(rel)}
+        mirror_old = {rel: entry for rel, entry in mirror_old.items() if not _excluded(rel)}
+        local_new, mirror_new = scan_tree(local_root, local_old), scan_tree(mirror_root, mirror_old)
+    if local_id is None or local_id != mirror_id:
+        # No shared history with this peer: diff everything, delete nothing
+        log.info(f"No matching sync history for {local_root} <-> {mirror_root}, doing a full sync")
+        local_old, mirror_old = {}, {}
+    plan = plan_sync(local_old, local_new, mirror_old, mirror_new)
+    summary = ', '.join(f"{len(ops)} {kind}" for kind, ops in plan.items())
+    if dry_run:
+        log.info(f"Sync plan for {local_root} <-> {mirror_root}: {summary}")
+        return plan
+
+    with span('sync_apply'):
+        manifests = {'local': local_new, 'mirror': mirror_new}
+        _apply(plan, {'local': local_root, 'mirror': mirror_root}, manifests)
+        sync_id = uuid.uuid4().hex
+        save_manifest(local_root, mirror_root, sync_id, manifests['local'])
+        save_manifest(mirror_root, local_root, sync_id, manifests['mirror'])
+    for rel in plan['conflicts']:
+        log.warning(f"Sync conflict on {rel}: kept the local change (a conflicting mirror edit is saved alongside)")
+    log.info(f"Synced {local_root} <-> {mirror_root}: {summary}")
+    return plan
@@ -0,0 +1,133 @@
+"""Lightweight logging and span timing for Boomerang.
+
+All modules log through `log` instead of print. Wrap an operation with the
+`traced` decorator or the `span` context manager to record how long it took;
+per-operation counts and totals plus a short list of recent slow operations are
+kept in memory for the tray's Diagnostics window. Optionally everything is also
+written to a rotating trace file.
+"""
+import collections
+import contextlib
+import functools
+import logging
+import logging.handlers
+import os
+import threading
+import time
+
+log = logging.getLogger('boomerang')
+
+SLOW_MS = 200  # Spans at least this slow are kept in recent_slow()
+_MAX_SLOW = 100
+
+_lock = threading.Lock()
+_stats = {}  # name -> [count, errors, total_ms, max_ms]
+_slow = collections.deque(maxlen=_MAX_SLOW)
+_file_handler = None
+_active = threading.local()  # Per-thread stack of open spans' fields
+
+if not log.handlers:
+    _console = logging.StreamHandler()
+    _console.setFormatter(logging.Formatter('%(message)s'))
+    log.addHandler(_console)
+    log.setLevel(logging.INFO)
+    log.propagate = False
+
+
+def get_trace_path():
+    return os.path.expanduser('~/.boomerang_trace.log')
+
+
+def configure(options):
+    """Apply log_level, trace_file and slow_ms from the options dict"""
+    global _file_handler, SLOW_MS
+    level = getattr(logging, str(options.get('log_level', 'INFO')).upper(), logging.INFO)
+    log.setLevel(level)
+    SLOW_MS = options.get('slow_ms', SLOW_MS)
+
+    trace_file = options.get('trace_file')
+    if _file_handler:
+        log.removeHandler(_file_handler)
+        _file_handler.close()
+        _file_handler = None
+    if trace_file:
+        path = trace_file if isinstance(trace_file, str) else get_trace_path()
+        _file_handler = logging.handlers.RotatingFileHandler(
+            os.path.expanduser(path), maxBytes=1024 * 1024, backupCount=3)
+        _file_handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(threadName)s %(message)s'))
+        log.addHandler(_file_handler)
+
+
+def _record(name, elapsed_ms, failed, fields):
+    with _lock:
+        entry = _stats.setdefault(name, [0, 0, 0.0, 0.0])
+        entry[0] += 1
+        entry[1] += failed
+        entry[2] += elapsed_ms
+        entry[3] = max(entry[3], elapsed_ms)
+        if elapsed_ms >= SLOW_MS:
+            _slow.append((time.time(), name, elapsed_ms, fields))
+    if log.isEnabledFor(logging.DEBUG):
+        extra = ' '.join(f"{k}={v}" for k, v in fields.items())
+        log.debug(f"span {name} {elapsed_ms:.1f}ms{' FAILED' if failed else ''} {extra}".rstrip())
+
+
+@contextlib.contextmanager
+def span(name, **fields):
+    """Time the enclosed block. Fields should be short and never idea text.
+
+    The span counts as failed if the block raises, or if it handles an error
+    itself and says so with mark_failed() (or by setting fields['failed']).
+    """
+    start = time.perf_counter()
+    failed = False
+    stack = _active.__dict__.setdefault('stack', [])
+    stack.append(fields)
+    try:
+        yield fields
+    except BaseException:
+        failed = True
+        raise
+    finally:
+        stack.pop()
+        failed = bool(fields.pop('failed', False)) or failed
+        _record(name, (time.perf_counter() - start) * 1000, failed, fields)
+
+
+def mark_failed():
+    """Count the innermost open span on this thread as failed without raising"""
+    stack = getattr(_active, 'stack', None)
+    if stack:
+        stack[-1]['failed'] = True
+
+
+def traced(name=None):
+    """Decorator form of span, named after the function by default"""
+    def decorator(fn):
+        span_name = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def stats():
+    """Return {name: {count, errors, total_ms, mean_ms, max_ms}}"""
+    with _lock:
+        return {name: {'count': c, 'errors': e, 'total_ms': t, 'mean_ms': t / c if c else 0.0, 'max_ms': m}
+                for name, (c, e, t, m) in _stats.items()}
+
+
+def recent_slow():
+    """Return recent slow spans as (timestamp, name, elapsed_ms, fields), newest first"""
+    with _lock:
+        return list(reversed(_slow))
+
+
+def reset():
+    with _lock:
+        _stats.clear()
+        _slow.clear()
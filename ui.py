@@ -1,10 +1,14 @@
 import datetime
+import os
 
-from PySide6.QtWidgets import (QMainWindow, QTextEdit, QVBoxLayout, QWidget, QPushButton, QHBoxLayout, QLabel, QDialog, QFileDialog, QMessageBox, QSpinBox)
-from PySide6.QtGui import QKeySequence, QShortcut
-from PySide6.QtCore import Qt, QEvent
+from PySide6.QtWidgets import (QMainWindow, QTextEdit, QVBoxLayout, QWidget, QPushButton, QHBoxLayout, QLabel, QDialog, QFileDialog, QMessageBox, QSpinBox, QPlainTextEdit, QListWidget)
+from PySide6.QtGui import QKeySequence, QShortcut, QTextCursor, QIcon, QPainter, QColor, QFont
+from PySide6.QtCore import Qt, QEvent, QTimer, QObject, Signal
 import platform
-from idea_manager import load_idea, save_idea, delete_idea, postpone_idea, create_new_idea, list_due_ideas
+from idea_manager import (load_idea_preview, iter_idea_chunks, save_idea, delete_idea, postpone_idea, create_new_idea,
+                          list_due_ideas, merge_due_ideas, scan_due_ideas, scan_idea_counts, add_idea_listener)
+import tracing
+from tracing import log
 
 
 if platform.system() == 'Darwin':
@@ -21,6 +25,166 @@ def _hide_from_dock():
     if NSApp:
         NSApp.setActivationPolicy_(NSApplicationActivationPolicyAccessory)
 
+class DueScanner(QObject):
+    """Scans several ideas folders in parallel and reports each on the GUI thread"""
+    folder_scanned = Signal(str, list)
+    finished = Signal()
+    _scanned = Signal(str, list)
+
+    def __init__(self, folders, parent=None):
+        super().__init__(parent)
+        self.folders = folders
+        self.pending = len(folders)
+        # Pool threads emit _scanned; Qt queues it onto this object's thread
+        self._scanned.connect(self._on_scanned)
+
+    def start(self):
+        if not self.folders:
+            self.finished.emit()
+            return
+        scan_due_ideas(self.folders, self._scanned.emit)
+
+    def _on_scanned(self, folder, paths):
+        self.pending -= 1
+        self.folder_scanned.emit(folder, paths)
+        if self.pending == 0:
+            self.finished.emit()
+
+class DueCounter(QObject):
+    """Keeps the number of due ideas current without rescanning the folders.
+
+    Folders are counted once (per date) in the background; after that the count
+    follows create/postpone/delete events from idea_manager, and a timer at local
+    midnight moves the new day's ideas into the due count. Timers can fire late
+    or not at all across suspend, so check_date() also catches up on demand.
+    """
+    changed = Signal(int)
+    _event = Signal(str, list)
+    _counted = Signal(int, object)
+
+    def __init__(self, folders, parent=None):
+        super().__init__(parent)
+        self.today = datetime.date.today()
+        self.due = 0
+        self.future = {}  # date -> ideas due that day, for dates after today
+        self._generation = 0
+        self._pending = 0
+        self._stale = False
+        self._totals = {}
+        self._event.connect(self._on_event)
+        self._counted.connect(self._on_counted)
+        self._midnight = QTimer(self)
+        self._midnight.setSingleShot(True)
+        self._midnight.setTimerType(Qt.PreciseTimer)
+        self._midnight.timeout.connect(self._rollover)
+        # Listeners may be called from any thread; the signal queues onto ours
+        add_idea_listener(lambda event, *paths: self._event.emit(event, list(paths)))
+        self.set_folders(folders)
+
+    def set_folders(self, folders):
+        self.folders = [os.path.abspath(f) for f in folders]
+        self.recount()
+
+    def recount(self):
+        self._generation += 1
+        self._pending = len(self.folders)
+        self._stale = False
+        self._totals = {}
+        if not self.folders:
+            self._apply({})
+            return
+        generation = self._generation
+        # Same pool as DueScanner; a folder that fails or times out counts as empty
+        scan_idea_counts(self.folders, lambda folder, counts: self._counted.emit(generation, counts))
+
+    def _on_counted(self, generation, counts):
+        if generation != self._generation:
+            return
+        for day, n in counts.items():
+            self._totals[day] = self._totals.get(day, 0) + n
+        self._pending -= 1
+        if self._pending:
+            return
+        if self._stale:
+            # Ideas changed while counting, so the scan may or may not include them
+            self.recount()
+            return
+        self._apply(self._totals)
+
+    def _apply(self, totals):
+        self.today = datetime.date.today()
+        self.due = sum(n for day, n in totals.items() if day <= self.today)
+        self.future = {day: n for day, n in totals.items() if day > self.today}
+        self._arm_midnight()
+        self.changed.emit(self.due)
+
+    def check_date(self):
+        """Roll over now if the date changed since the last count (e.g. after resume)"""
+        if datetime.date.today() != self.today:
+            self._rollover()
+
+    def _on_event(self, event, paths):
+        self.check_date()
+        if self._pending:
+            self._stale = True
+            return
+        if event == 'bulk':
+            self.recount()
+            return
+        if event in ('deleted', 'moved'):
+            self._adjust(paths[0], -1)
+        if event in ('created', 'moved'):
+            self._adjust(paths[-1], 1)
+        self.changed.emit(self.due)
+
+    def _adjust(self, path, delta):
+        path = os.path.abspath(path)
+        if not any(path.startswith(folder + os.sep) for folder in self.folders):
+            return
+        name = os.path.basename(path)
+        try:
+            day = datetime.date(int(name[:4]), int(name[4:6]), int(name[6:8]))
+        except ValueError:
+            return
+        if day <= self.today:
+            self.due = max(0, self.due + delta)
+        else:
+            self.future[day] = self.future.get(day, 0) + delta
+            if self.future[day] <= 0:
+                del self.future[day]
+
+    def _arm_midnight(self):
+        now = datetime.datetime.now()
+        midnight = datetime.datetime.combine(now.date() + datetime.timedelta(days=1), datetime.time.min)
+        # A second late so date.today() has definitely rolled over
+        self._midnight.start(int((midnight - now).total_seconds() * 1000) + 1000)
+
+    def _rollover(self):
+        self.today = datetime.date.today()
+        for day in [day for day in self.future if day <= self.today]:
+            self.due += self.future.pop(day)
+        self._arm_midnight()
+        self.changed.emit(self.due)
+
+def badge_icon(icon, count):
+    """Return icon with count drawn in a corner badge (icon unchanged for 0)"""
+    if count <= 0:
+        return icon
+    pixmap = icon.pixmap(64, 64)
+    painter = QPainter(pixmap)
+    painter.setRenderHint(QPainter.Antialiasing)
+    painter.setPen(Qt.NoPen)
+    painter.setBrush(QColor(220, 40, 40))
+    painter.drawEllipse(28, 28, 36, 36)
+    font = QFont()
+    font.setBold(True)
+    font.setPixelSize(22 if count < 100 else 16)
+    painter.setFont(font)
+    painter.setPen(QColor(255, 255, 255))
+    painter.drawText(28, 28, 36, 36, Qt.AlignCenter, str(count) if count < 1000 else '999+')
+    painter.end()
+    return QIcon(pixmap)
+
 class PostponeDialog(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -64,23 +228,33 @@ class PostponeDialog(QDialog):
             self.date_label.setText("")
 
 class ProcessWindow(QMainWindow):
-    def __init__(self, ideas_folder, parent=None):
+    def __init__(self, ideas_folder, parent=None, due_items=None):
         super().__init__(parent)
         self.setWindowTitle("Process Ideas")
         # Make window stay on top
         self.setWindowFlags(self.windowFlags() | Qt.WindowStaysOnTopHint)
         self.ideas_folder = ideas_folder
-        self.due_ideas = list_due_ideas(ideas_folder)  # From idea_manager
+        if due_items is None:
+            due_items = [(path, ideas_folder) for path in list_due_ideas(ideas_folder)]  # From idea_manager
+        # Queue of (path, folder it belongs to); more can arrive via add_due_ideas
+        self.due_ideas = [path for path, _ in due_items]
+        self.idea_folders = dict(due_items)
         self.current_index = 0
         self.is_editing = False
+        self.preview_truncated = False
+        self._chunks = None  # Iterator while a large idea is being loaded in full
 
         self.central_widget = QWidget()
         self.setCentralWidget(self.central_widget)
         layout = QVBoxLayout()
 
-        self.text_edit = QTextEdit()
+        # Plain text widget: ideas are plain text, and it handles very large documents
+        self.text_edit = QPlainTextEdit()
         self.text_edit.setReadOnly(True)
         layout.addWidget(self.text_edit)
+        self.preview_label = QLabel("")
+        self.preview_label.setVisible(False)
+        layout.addWidget(self.preview_label)
 
         button_layout = QHBoxLayout()
         self.edit_btn = QPushButton("Edit (E)")
@@ -146,7 +320,11 @@ class ProcessWindow(QMainWindow):
             super().keyPressEvent(event)
 
     def toggle_edit(self):
-        if self.current_index >= len(self.due_ideas):
+        if self.current_index >= len(self.due_ideas) or self._chunks is not None:
+            return
+        if self.preview_truncated:
+            # Only the preview is shown; load everything before allowing edits
+            self.load_full_idea()
             return
         if self.is_editing:
             text = self.text_edit.toPlainText()
@@ -161,13 +339,14 @@ class ProcessWindow(QMainWindow):
             self.edit_btn.setText("Save (Enter)")
 
     def handle_delete(self):
-        if self.current_index >= len(self.due_ideas):
+        if self.current_index >= len(self.due_ideas) or self._chunks is not None:
             return
-        delete_idea(self.due_ideas[self.current_index], self.ideas_folder)
+        path = self.due_ideas[self.current_index]
+        delete_idea(path, self.idea_folders[path])
         self.move_to_next()
 
     def handle_postpone(self):
-        if self.current_index >= len(self.due_ideas):
+        if self.current_index >= len(self.due_ideas) or self._chunks is not None:
             return
         if not self.postpone_mode:
             # enter postpone mode
@@ -181,7 +360,8 @@ class ProcessWindow(QMainWindow):
         else:
             # confirm postpone
             days = int(self.days_str or '0')
-            postpone_idea(self.due_ideas[self.current_index], days, self.ideas_folder)
+            path = self.due_ideas[self.current_index]
+            postpone_idea(path, days, self.idea_folders[path])
             self.exit_postpone_mode()
             self.move_to_next()
 
@@ -200,6 +380,20 @@ class ProcessWindow(QMainWindow):
         self.date_label_inline.setVisible(False)
         self.info_label_inline.setVisible(False)
 
+    def add_due_ideas(self, folder, paths):
+        """Merge ideas from a folder whose scan finished late into the unprocessed queue"""
+        new = [(path, folder) for path in paths if path not in self.idea_folders]
+        if not new:
+            return
+        self.idea_folders.update(new)
+        # Keep the idea on screen where it is; only reorder what comes after it
+        keep = self.current_index + 1 if self.current_index < len(self.due_ideas) else self.current_index
+        pending = [(path, self.idea_folders[path]) for path in self.due_ideas[keep:]]
+        self.due_ideas = self.due_ideas[:keep] + [path for path, _ in merge_due_ideas(pending, new)]
+        if keep == self.current_index:
+            # Was showing "No more ideas"
+            self.load_current_idea()
+
     def move_to_next(self):
         self.current_index += 1
         self.load_current_idea()
@@ -220,14 +414,21 @@ class ProcessWindow(QMainWindow):
 
     def load_current_idea(self):
         if self.current_index >= len(self.due_ideas):
-            self.text_edit.setText("No more ideas to process today.")
+            self.text_edit.setPlainText("No more ideas to process today.")
+            self.preview_label.setVisible(False)
             self.edit_btn.setEnabled(False)
             self.delete_btn.setEnabled(False)
             self.postpone_btn.setEnabled(False)
             return
         self.exit_postpone_mode()
-        text = load_idea(self.due_ideas[self.current_index])
-        self.text_edit.setText(text)
+        self._chunks = None
+        text, truncated, size = load_idea_preview(self.due_ideas[self.current_index])
+        self.preview_truncated = truncated
+        self.text_edit.setPlainText(text)
+        self.text_edit.setUndoRedoEnabled(True)
+        self.preview_label.setText(
+            f"Showing the first {len(text):,} characters of {size / (1024 * 1024):.1f} MB. Press E to load it all and edit.")
+        self.preview_label.setVisible(truncated)
         self.text_edit.setReadOnly(True)
         self.is_editing = False
         self.edit_btn.setText("Edit (E)")
@@ -235,6 +436,45 @@ class ProcessWindow(QMainWindow):
         self.delete_btn.setEnabled(True)
         self.postpone_btn.setEnabled(True)
 
+    def load_full_idea(self):
+        """Replace the preview with the whole idea, a chunk per event loop turn"""
+        self._chunks = iter_idea_chunks(self.due_ideas[self.current_index])
+        self.text_edit.setUndoRedoEnabled(False)
+        self.text_edit.clear()
+        self.edit_btn.setEnabled(False)
+        self.delete_btn.setEnabled(False)
+        self.postpone_btn.setEnabled(False)
+        self.preview_label.setText("Loading full idea...")
+        QTimer.singleShot(0, lambda chunks=self._chunks: self._load_next_chunk(chunks))
+
+    def _load_next_chunk(self, chunks):
+        if chunks is not self._chunks:
+            return  # Moved on to another idea
+        try:
+            chunk = next(chunks)
+        except StopIteration:
+            chunk = None
+        except Exception as e:
+            log.error(f"Error loading idea {self.due_ideas[self.current_index]}: {e}")
+            QMessageBox.critical(self, "Error", f"Failed to load idea: {e}")
+            self.load_current_idea()
+            return
+        if chunk is not None:
+            cursor = self.text_edit.textCursor()
+            cursor.movePosition(QTextCursor.End)
+            cursor.insertText(chunk)
+            QTimer.singleShot(0, lambda: self._load_next_chunk(chunks))
+            return
+        self._chunks = None
+        self.preview_truncated = False
+        self.text_edit.setUndoRedoEnabled(True)
+        self.text_edit.moveCursor(QTextCursor.Start)
+        self.preview_label.setVisible(False)
+        self.edit_btn.setEnabled(True)
+        self.delete_btn.setEnabled(True)
+        self.postpone_btn.setEnabled(True)
+        self.toggle_edit()
+
     def showEvent(self, event):
         super().showEvent(event)
         _show_in_dock()
@@ -286,7 +526,7 @@ class AddIdeaWindow(QMainWindow):
         self.cancel_btn.clicked.connect(self.close)
         self.update_ui()
 
-        print("AddIdeaWindow initialized")
+        log.debug("AddIdeaWindow initialized")
         _show_in_dock()
 
     def showEvent(self, event):
@@ -425,6 +665,22 @@ class OptionsWindow(QDialog):
         self.interval_spinbox.setSuffix(" days")
         interval_layout.addWidget(self.interval_spinbox)
         layout.addLayout(interval_layout)
+
+        # Additional folders, each with its own backup folder
+        layout.addWidget(QLabel(""))  # Spacer
+        layout.addWidget(QLabel("Additional Ideas Folders:"))
+        self.extra_folders = [dict(f) for f in options.get('extra_ideas_folders', [])]
+        self.extra_list = QListWidget()
+        layout.addWidget(self.extra_list)
+        extra_btn_layout = QHBoxLayout()
+        add_extra_btn = QPushButton("Add Folder")
+        remove_extra_btn = QPushButton("Remove Folder")
+        add_extra_btn.clicked.connect(self.add_extra_folder)
+        remove_extra_btn.clicked.connect(self.remove_extra_folder)
+        extra_btn_layout.addWidget(add_extra_btn)
+        extra_btn_layout.addWidget(remove_extra_btn)
+        layout.addLayout(extra_btn_layout)
+        self.refresh_extra_list()
         
         # Save/Cancel buttons
         button_layout = QHBoxLayout()
@@ -450,6 +706,25 @@ class OptionsWindow(QDialog):
             self.selected_backup_folder = folder
             self.backup_label.setText(f"Backup Folder: {folder}")
 
+    def refresh_extra_list(self):
+        self.extra_list.clear()
+        for f in self.extra_folders:
+            self.extra_list.addItem(f"{f['path']}  (backup: {f.get('backup_folder') or 'none'})")
+
+    def add_extra_folder(self):
+        folder = QFileDialog.getExistingDirectory(self, "Select Additional Ideas Folder")
+        if not folder:
+            return
+        backup = QFileDialog.getExistingDirectory(self, f"Select Backup Folder for {folder} (cancel for none)")
+        self.extra_folders.append({'path': folder, 'backup_folder': backup or None})
+        self.refresh_extra_list()
+
+    def remove_extra_folder(self):
+        row = self.extra_list.currentRow()
+        if row >= 0:
+            del self.extra_folders[row]
+            self.refresh_extra_list()
+
     def save_options(self):
         # Update options dict
         if self.selected_folder:
@@ -457,4 +732,51 @@ class OptionsWindow(QDialog):
         if self.selected_backup_folder:
             self.options['backup_folder'] = self.selected_backup_folder
         self.options['backup_interval_days'] = self.interval_spinbox.value()
-        self.accept() 
\ No newline at end of file
+        self.options['extra_ideas_folders'] = self.extra_folders
+        self.accept() 
+
+class DiagnosticsWindow(QDialog):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Diagnostics")
+        self.resize(640, 420)
+
+        layout = QVBoxLayout()
+        self.text_view = QPlainTextEdit()
+        self.text_view.setReadOnly(True)
+        layout.addWidget(self.text_view)
+
+        button_layout = QHBoxLayout()
+        refresh_btn = QPushButton("Refresh")
+        reset_btn = QPushButton("Reset")
+        close_btn = QPushButton("Close")
+        refresh_btn.clicked.connect(self.refresh)
+        reset_btn.clicked.connect(self.reset)
+        close_btn.clicked.connect(self.close)
+        button_layout.addWidget(refresh_btn)
+        button_layout.addWidget(reset_btn)
+        button_layout.addWidget(close_btn)
+        layout.addLayout(button_layout)
+
+        self.setLayout(layout)
+        self.refresh()
+
+    def refresh(self):
+        lines = [f"Recent slow operations (>= {tracing.SLOW_MS} ms):"]
+        slow = tracing.recent_slow()
+        if not slow:
+            lines.append("  none")
+        for ts, name, elapsed_ms, fields in slow:
+            when = datetime.datetime.fromtimestamp(ts).strftime('%Y-%m-%d %H:%M:%S')
+            extra = ' '.join(f"{k}={v}" for k, v in fields.items())
+            lines.append(f"  {when}  {name:24} {elapsed_ms:9.1f} ms  {extra}".rstrip())
+
+        lines.append("")
+        lines.append(f"{'Operation':26} {'count':>7} {'errors':>7} {'mean ms':>9} {'max ms':>9}")
+        for name, s in sorted(tracing.stats().items(), key=lambda item: -item[1]['total_ms']):
+            lines.append(f"{name:26} {s['count']:7} {s['errors']:7} {s['mean_ms']:9.1f} {s['max_ms']:9.1f}")
+        self.text_view.setPlainText('\n'.join(lines))
+
+    def reset(self):
+        tracing.reset()
+        self.refresh()